@@ -16,8 +16,10 @@ import tempfile
 sys.path.append(os.getcwd() + '/lib')
 import preppy
 from config import ConfigData
+from modules import tools, archive
 from datetime import date
 from template import parser
+from template.tables import TableRegistry
 
 
 __version__ = 0.2
@@ -45,6 +47,9 @@ def main(argv=None):
         optparser.add_option("-c", dest="config", metavar="<file>", help="the config file to use")
         optparser.add_option("--tui", dest="tui", action="store_true", default=False, help="starts the TUI" )
         optparser.add_option("--ignore-check", dest="ignore", action="store_true", default=False, help="ignore host sanity checks" )
+        optparser.add_option("--no-cache", dest="nocache", action="store_true", default=False, help="parse all logs again and don't use the cache" )
+        optparser.add_option("--build-index", dest="buildindex", action="store_true", default=False, help="index .tar.gz logs on the first scan even if pigz is installed" )
+        optparser.add_option("--spool-size", dest="spool", metavar="<MB>", type="int", default=None, help="nested archives larger than this are spooled to disk instead of memory (default 64)" )
         
 
     # process options
@@ -56,9 +61,15 @@ def main(argv=None):
         t.run()
         exit(0) 
     
+    if opts.buildindex:
+        archive.BUILD_INDEX = True
+    
+    if opts.spool is not None:
+        tools.SPOOL_THRESHOLD = opts.spool * 1024 * 1024
+    
     if opts.config:
         try:
-            configData = ConfigData(opts.config, True)
+            configData = ConfigData(opts.config, True, not opts.nocache)
             
         except Exception as e:
             optparser.error("Failed to read the config file {0}: {1}".format(opts.config, e))
@@ -79,6 +90,7 @@ def main(argv=None):
         doc.arrangeTitle(story)
         
     templateParser = parser.TemplateParser(doc, configData)
+    tables = TableRegistry()
     
     for template in config.templates:
     #    if config["templates"][template] not in previewTemplates:
@@ -88,7 +100,10 @@ def main(argv=None):
             mod = preppy.getModule(configData.getConfigPath() + "/" + template, source_extension=".template", savePyc=0)
         else:
             mod = preppy.getModule("templates/" + template, source_extension=".template", savePyc=0)
-        templateParser.parse(mod.get(config), story)
+        with tables:
+            html = mod.get(config)
+        
+        templateParser.parse(html, story, tables)
         
     # remove the last pagebreak
     story.pop()
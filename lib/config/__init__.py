@@ -15,7 +15,10 @@ from jsoncfg.text_encoding import load_utf_text_file
 from collections import OrderedDict
 from copy import deepcopy
 from modules.tools import istext
+from modules.cache import ArchiveCache
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from ClusterShell.NodeSet import NodeSet, NodeSetParseError
 
 class ConfigDict(OrderedDict):
     __getattr__= OrderedDict.__getitem__
@@ -32,9 +35,10 @@ class ConfigDict(OrderedDict):
 
 class ConfigData():
     
-    def __init__(self, configFile, generateConfigData=False):
+    def __init__(self, configFile, generateConfigData=False, useCache=True):
         self.__configFile = configFile
         self.__orig_config = self.__loadJson__()
+        self.__cache = ArchiveCache(self.getConfigPath()) if useCache else None
         
         if generateConfigData:
             self.generateConfigData(True)
@@ -100,7 +104,7 @@ class ConfigData():
     
     
     def generateConfigData(self, ignore):
-        from modules import sfa, gpfs, lustre
+        from modules import gpfs, lustre
         
         config = copy.deepcopy(self.__orig_config)
         
@@ -112,9 +116,15 @@ class ConfigData():
                 print ("  Collecting data for project '{}'".format(proj))
                 
                 '''SFA'''
+                # A project without SFA logs (e.g. gpfs only) gets an empty sfa section
+                sfa_data = ConfigDict()
+                
                 if "sfa" in config.project[proj]:
-                    sfa_data = ConfigDict()
                     sfa_config = config.project[proj].sfa
+                    
+                    # The logs are read first and parsed together afterwards.
+                    # Each entry is (subsystem name from the config or None, log text)
+                    texts = []
                         
                     # Single log file which could be a TXT or a TGZ file
                     # Get the subsystem name from the log file
@@ -126,9 +136,7 @@ class ConfigData():
                                 for subsystemName in conf:
                                     print ("    Parsing 'show sub sum'")
                                     print("      - {}".format(conf[subsystemName]))
-                                    with open("{0}/{1}".format(self.getConfigPath(), conf[subsystemName]), "rb") as f:
-                                        sss = sfa.parse_sss(f.read().decode("utf-8")).getData()
-                                        sfa_data.update({subsystemName: sss})   
+                                    texts.append((subsystemName, self.__readSSS("{0}/{1}".format(self.getConfigPath(), conf[subsystemName]))))
                             
                             # a TXT or TGZ file
                             if isinstance(conf, str):
@@ -138,28 +146,34 @@ class ConfigData():
                                 if istext(file):
                                     print ("    Parsing 'show sub sum'")
                                     print("      - {}".format(conf))
-                                    with open(file, "rb") as f:
-                                        sss = sfa.parse_sss(f.read().decode("utf-8")).getData()
-                                        sfa_data.update({sss.getSubsystemName(): sss})
+                                    texts.append((None, self.__readSSS(file)))
                                         
                                 # Is a TGZ file
                                 elif tarfile.is_tarfile(file):
-                                    with tarfile.open(file, "r") as tar:
-                                        print ("    Parsing 'show sub sum' in {}".format(conf))
-                                        for member in tar.getmembers():
-                                            print("      - {}".format(member.name))
-                                            f = tar.extractfile(member)
-                                            read = f.read().decode("utf-8")
-                                            sss = sfa.parse_sss(read).getData()
-                                            sfa_data.update({sss.getSubsystemName(): sss})
-                                     
+                                    print ("    Parsing 'show sub sum' in {}".format(conf))
+                                    for text in self.__readSSSTar(file):
+                                        print("      - {}".format(text.member))
+                                        texts.append((None, text))
+                    
+                    for (subsystemName, text), sss in zip(texts, self.__parseSSS([text for _, text in texts])):
+                        sfa_data.update({subsystemName if subsystemName else sss.getSubsystemName(): sss})
+                    
+                    sfa_data = self.__foldSubsystems(sfa_data)
                             
                 config.project[proj].sfa = sfa_data
                 
                 '''GPFS'''
-                #if "gpfs" in config.project[proj]:
-                #    for filesystem in config.project[proj].gpfs:
-                #        print(filesystem)
+                # The gsctl archives are parsed when a template uses them first
+                if "gpfs" in config.project[proj]:
+                    gpfs_config = config.project[proj].gpfs
+                    
+                    if isinstance(gpfs_config, str):
+                        gpfs_config = [gpfs_config]
+                    
+                    for conf in gpfs_config:
+                        print ("    Adding gsctl: {}".format(conf))
+                    
+                    config.project[proj].gpfs = gpfs.lazy_gsctl(["{}/{}".format(self.getConfigPath(), conf) for conf in gpfs_config], self.__cache)
                     
                 '''LUSTRE'''
                 if "lustre" in config.project[proj]:
@@ -174,7 +188,7 @@ class ConfigData():
                                 print ("    Parsing es_showall: {}'".format(conf))
                                 file = "{}/{}".format(self.getConfigPath(), conf)
                             
-                                lustre_config[idx] = lustre.parse_esctl(file).getData()
+                                lustre_config[idx] = lustre.parse_esctl(file, cache=self.__cache).getData()
                                 
                                 if len(lustre_config) == 1:
                                     config.project[proj].lustre = lustre_config[0]
@@ -189,13 +203,118 @@ class ConfigData():
                                 print ("    Parsing es_showall: {}'".format(lustre_config[nodes]))
                                 file = "{}/{}".format(self.getConfigPath(), lustre_config[nodes])
                                 
-                                config.project[proj].lustre = lustre.parse_esctl(file, nodes).getData()
+                                config.project[proj].lustre = lustre.parse_esctl(file, nodes, cache=self.__cache).getData()
 
                 print("\n")
                       
         self.__config = config 
         return config
     
+    def __readSSS(self, file):
+        """Read a 'show sub sum' text file. The sections are taken from the cache, if available."""
+        cached = self.__cache.get(file, "sss-sections") if self.__cache else None
+        
+        if cached:
+            return SSSText(file, None, cached["Content"], cached["Sections"], True)
+        
+        with open(file, "rb") as f:
+            return SSSText(file, None, f.read().decode("utf-8"), None, False)
+    
+    def __readSSSTar(self, file):
+        """Read all 'show sub sum' files of a tar. The sections are taken from the cache, if available."""
+        members = self.__cache.get(file, "sss-tar-sections") if self.__cache else None
+        
+        if members:
+            return [SSSText(file, name, cached["Content"], cached["Sections"], True) for name, cached in members]
+        
+        texts = []
+        with tarfile.open(file, "r") as tar:
+            for member in tar.getmembers():
+                if not member.isfile():
+                    continue
+                
+                f = tar.extractfile(member)
+                texts.append(SSSText(file, member.name, f.read().decode("utf-8"), None, False))
+        
+        return texts
+    
+    def __parseSSS(self, texts):
+        """Parse the 'show sub sum' texts and cache the sections of the files read
+        
+           The sections of the texts, that aren't cached, are parsed in a process pool.
+        
+           Returns
+           -------
+           list 
+                the parse_sss objects in the order of the texts
+        """
+        from modules import sfa
+        
+        missing = [text for text in texts if text.sections is None]
+        
+        if len(missing) > 1:
+            with ProcessPoolExecutor(max_workers=min(len(missing), os.cpu_count())) as pool:
+                for text, sections in zip(missing, pool.map(sfa.parseSections, [text.content for text in missing], chunksize=4)):
+                    text.sections = sections
+        
+        parsed = [sfa.parse_sss(text.content, text.sections).getData() for text in texts]
+        
+        if self.__cache:
+            files = OrderedDict()
+            
+            for text, sss in zip(texts, parsed):
+                if not text.cached:
+                    files.setdefault(text.file, []).append((text.member, {"Content": sss.getContent(), "Sections": sss.getSections()}))
+            
+            for file, members in files.items():
+                if members[0][0] is None:
+                    self.__cache.put(file, "sss-sections", members[0][1])
+                else:
+                    self.__cache.put(file, "sss-tar-sections", members)
+        
+        return parsed
+    
+    def __foldSubsystems(self, sfa_data):
+        """Group identical subsystems under their folded names, e.g. sfa[1-4]
+        
+           The subsystems are compared by their fingerprint. The first subsystem of a group 
+           is kept for the group. Subsystems already folded in the config or without a 
+           fingerprint (a section couldn't be parsed) are kept as they are.
+        """
+        groups = OrderedDict()
+        
+        for subsystemName, sss in sfa_data.items():
+            if not subsystemName or "[" in subsystemName or sss.getFingerprint() is None:
+                groups[(subsystemName,)] = [(subsystemName, sss)]
+            else:
+                groups.setdefault(sss.getFingerprint(), []).append((subsystemName, sss))
+        
+        folded = ConfigDict()
+        
+        for members in groups.values():
+            try:
+                name = str(NodeSet.fromlist([subsystemName for subsystemName, _ in members])) if len(members) > 1 else members[0][0]
+            except NodeSetParseError:
+                folded.update(members)
+                continue
+            
+            if len(members) > 1:
+                print("    Identical subsystems are shown once as {}".format(name))
+            
+            folded[name] = members[0][1]
+        
+        return folded
+    
+class SSSText():
+    """The text of a 'show sub sum' file or tar member and its sections, if known"""
+    
+    def __init__(self, file, member, content, sections, cached):
+        self.file = file
+        self.member = member
+        self.content = content
+        self.sections = sections
+        self.cached = cached
+    
 class ConfigWriter:
 
     #general
@@ -0,0 +1,212 @@
+'''
+Created on 18 Oct 2026
+
+@author: mwolf
+
+This module is for reading the log archives in a single forward pass.
+The compression is detected from the magic bytes. If a multi-threaded
+decompressor is installed (pigz, xz, lbzip2/pbzip2, python-zstandard or
+zstd), the archive is decompressed by it, otherwise by the stdlib.
+
+A .tar.gz is read in-process to build the checkpoint index stored next
+to it (see gzindex), if BUILD_INDEX is set or no external decompressor
+is installed. Once an archive has an index, only the members extracted
+by the scan are decompressed.
+
+An already extracted archive (a directory) is walked with os.scandir
+and its files are read via mmap, named like the members of the tar.
+
+'''
+
+import os
+import io
+import mmap
+import tarfile
+import shutil
+
+from subprocess import Popen, PIPE, DEVNULL
+
+from modules import gzindex
+from modules.tools import mappedFile
+
+#Magic bytes of the supported compressions
+MAGIC = [(b"\x1f\x8b", "gzip"),
+         (b"\xfd7zXZ\x00", "xz"),
+         (b"\x28\xb5\x2f\xfd", "zstd"),
+         (b"BZh", "bzip2")]
+
+#Build the index of a .tar.gz even if an external decompressor is installed (--build-index)
+BUILD_INDEX = False
+
+#External decompressors, the first one installed is used
+DECOMPRESSORS = {"gzip": [["pigz", "-dc"]],
+                 "xz": [["xz", "-dc", "-T0"]],
+                 "zstd": [["zstd", "-dc"]],
+                 "bzip2": [["lbzip2", "-dc"], ["pbzip2", "-dc"]]}
+
+def detectCompression(path):
+    """Get the compression of the file from its magic bytes or None if it isn't compressed"""
+    with open(path, "rb") as f:
+        head = f.read(8)
+
+    for magic, compression in MAGIC:
+        if head.startswith(magic):
+            return compression
+
+    return None
+
+def getDecompressor(compression):
+    """Get the command line of the first installed decompressor or None"""
+    for command in DECOMPRESSORS.get(compression, []):
+        if shutil.which(command[0]):
+            return command
+
+    return None
+
+class ExtractedTree():
+    """Iterates the files of an extracted archive like a tarfile in stream mode
+
+       The members are named "<directory name>/<relative path>", as they
+       were in the tar archive. The files are mapped into memory and the
+       maps are closed together with the tree.
+    """
+
+    def __init__(self, path):
+        self.__path = os.path.normpath(path)
+        self.__root = os.path.basename(self.__path)
+        self.__maps = []
+
+    def __iter__(self):
+        yield from self.__walk(self.__path, self.__root)
+
+    def __walk(self, path, name):
+        with os.scandir(path) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self.__walk(entry.path, name + "/" + entry.name)
+                elif entry.is_file():
+                    member = tarfile.TarInfo(name + "/" + entry.name)
+                    member.size = entry.stat().st_size
+                    yield member
+
+    def extractfile(self, member):
+        if member.size == 0:
+            return io.BytesIO()
+
+        with open(os.path.join(os.path.dirname(self.__path), member.name), "rb") as f:
+            self.__maps.append(mappedFile(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+        return self.__maps[-1]
+
+    def close(self):
+        for mapped in self.__maps:
+            mapped.close()
+
+        self.__maps = []
+
+class TrackedTar():
+    """A tarfile in stream mode, that knows if the iteration reached the end of the archive"""
+
+    def __init__(self, tar):
+        self.__tar = tar
+        self.complete = False
+
+    def __iter__(self):
+        yield from self.__tar
+        self.complete = True
+
+    def __getattr__(self, name):
+        return getattr(self.__tar, name)
+
+class openTar():
+    """Opens a tar archive for a single forward pass (stream mode)
+
+       A directory is opened as ExtractedTree.
+
+       Usage
+       -----
+       with openTar(path) as tar:
+           for member in tar:
+               ...
+    """
+
+    def __init__(self, path):
+        self.__path = path
+        self.__proc = None
+        self.__file = None
+        self.__tar = None
+        self.__builder = None
+
+    def __enter__(self):
+        if os.path.isdir(self.__path):
+            self.__tar = ExtractedTree(self.__path)
+            return self.__tar
+
+        compression = detectCompression(self.__path)
+
+        if compression == "gzip" and gzindex.available():
+            index = gzindex.GzipIndex.load(self.__path)
+
+            if index:
+                self.__tar = gzindex.IndexedTar(index)
+                return self.__tar
+
+            # The first scan is decompressed by pigz, unless the index is asked for
+            if BUILD_INDEX or not getDecompressor(compression):
+                self.__builder = gzindex.GzipIndexBuilder(self.__path)
+                self.__file = self.__builder
+                self.__tar = TrackedTar(tarfile.open(fileobj=self.__builder, mode="r|"))
+                return self.__tar
+
+        if compression == "zstd":
+            try:
+                import zstandard
+                self.__file = open(self.__path, "rb")
+                self.__tar = tarfile.open(fileobj=zstandard.ZstdDecompressor().stream_reader(self.__file), mode="r|")
+                return self.__tar
+            except ImportError:
+                pass
+
+        command = getDecompressor(compression)
+
+        if command:
+            self.__proc = Popen(command + [self.__path], stdout=PIPE, stderr=DEVNULL)
+
+            try:
+                self.__tar = tarfile.open(fileobj=self.__proc.stdout, mode="r|")
+            except Exception:
+                self.__proc.kill()
+                self.__proc.stdout.close()
+                self.__proc.wait()
+                raise
+        elif compression == "zstd":
+            raise tarfile.CompressionError("zstd compressed archive, but neither python-zstandard nor zstd is installed")
+        else:
+            self.__tar = tarfile.open(self.__path, "r|*")
+
+        return self.__tar
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # The index is only complete if the scan read the whole archive
+        if self.__builder and exc_type is None and self.__tar.complete:
+            self.__builder.save(self.__tar.members)
+
+        self.__tar.close()
+
+        if self.__file:
+            self.__file.close()
+
+        if self.__proc:
+            # The scan might stop early, so the decompressor can still be running
+            finished = self.__proc.poll() is not None
+
+            if not finished:
+                self.__proc.terminate()
+
+            self.__proc.stdout.close()
+            self.__proc.wait()
+
+            if finished and self.__proc.returncode != 0 and exc_type is None:
+                raise tarfile.ReadError("{} failed to decompress {}".format(self.__proc.args[0], self.__path))
+
+        return False
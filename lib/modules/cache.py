@@ -0,0 +1,101 @@
+'''
+Created on 18 Oct 2026
+
+@author: mwolf
+
+This module is for caching the parsed content of the log archives.
+The cache is stored next to the config file in ".docscaler_cache" and
+is keyed by the path of the archive. Each entry holds a fingerprint of
+the archive (size, mtime and a sampled hash), so a changed archive is
+parsed again on the next run. Entries of an older format (VERSION) are
+ignored as well. Large content is kept in a separate blob
+file next to the entry.
+
+'''
+
+import os
+import json
+import shutil
+import hashlib
+
+from collections import OrderedDict
+
+class ArchiveCache():
+
+    CACHE_DIR = ".docscaler_cache"
+
+    #Format of the entries, entries of another format are ignored
+    VERSION = 1
+
+    #Number and size of the blocks hashed for the fingerprint
+    SAMPLES = 16
+    SAMPLE_SIZE = 65536
+
+    def __init__(self, path):
+        self.__path = os.path.join(path, self.CACHE_DIR)
+
+    def fingerprint(self, archive):
+        """Fingerprint of the archive based on the size, mtime and a sampled hash of the content"""
+        stat = os.stat(archive)
+        sha = hashlib.sha1("{}:{}".format(stat.st_size, stat.st_mtime_ns).encode())
+
+        with open(archive, "rb") as f:
+            if stat.st_size <= self.SAMPLES * self.SAMPLE_SIZE:
+                sha.update(f.read())
+            else:
+                step = (stat.st_size - self.SAMPLE_SIZE) // (self.SAMPLES - 1)
+                for sample in range(self.SAMPLES):
+                    f.seek(sample * step)
+                    sha.update(f.read(self.SAMPLE_SIZE))
+
+        return sha.hexdigest()
+
+    def get(self, archive, kind):
+        """Get the cached data of the archive or None if there is no valid entry"""
+        entry = self.__entry(archive, kind)
+
+        if not os.path.isfile(entry):
+            return None
+
+        try:
+            with open(entry, "r") as f:
+                cached = json.load(f, object_pairs_hook=OrderedDict)
+        except (OSError, ValueError):
+            return None
+
+        if cached.get("version") != self.VERSION or cached.get("fingerprint") != self.fingerprint(archive):
+            return None
+
+        return cached["data"]
+
+    def blob(self, archive, kind):
+        """Path of the blob stored together with the entry"""
+        return os.path.splitext(self.__entry(archive, kind))[0] + ".blob"
+
+    def put(self, archive, kind, data, blob = None):
+        """Store the parsed data of the archive. An older entry of the same archive is replaced."""
+        entry = self.__entry(archive, kind)
+
+        try:
+            os.makedirs(self.__path, exist_ok=True)
+
+            if blob:
+                with open(self.blob(archive, kind) + ".tmp", "wb") as f:
+                    shutil.copyfileobj(blob, f)
+
+                os.replace(self.blob(archive, kind) + ".tmp", self.blob(archive, kind))
+
+            with open(entry + ".tmp", "w") as f:
+                json.dump({"version": self.VERSION,
+                           "archive": os.path.abspath(archive),
+                           "kind": kind,
+                           "fingerprint": self.fingerprint(archive),
+                           "data": data}, f)
+
+            os.replace(entry + ".tmp", entry)
+        except OSError as e:
+            print("      NOTE: Can't write the cache for {}: {}".format(archive, e))
+
+    def __entry(self, archive, kind):
+        key = hashlib.sha1("{}:{}".format(os.path.abspath(archive), kind).encode()).hexdigest()
+        return os.path.join(self.__path, key + ".json")
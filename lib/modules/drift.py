@@ -0,0 +1,122 @@
+'''
+Created on 18 Oct 2026
+
+@author: mwolf
+
+This module is for the configuration drift between the nodes of a cluster.
+The nodes are grouped by the digest of each file of interest, so every file
+is hashed once per node. Each group is folded into a NodeSet and only the
+representatives of the groups are diffed against the largest group.
+
+'''
+
+import hashlib
+import difflib
+
+from collections import OrderedDict
+from ClusterShell.NodeSet import NodeSet, NodeSetParseError
+
+def digest(content):
+    return hashlib.sha1(content.encode()).digest()
+
+def fold(nodes):
+    """Folds the nodes into a NodeSet string, e.g. node[01-04]"""
+    try:
+        return str(NodeSet.fromlist(nodes))
+    except NodeSetParseError:
+        return ",".join(nodes)
+
+class ConfigDrift():
+    """Groups the nodes by the content of their files of interest
+
+       Usage
+       -----
+       drift = ConfigDrift(config, nodes)
+       drift.groups("etc.modprobe.d.lustre.conf")  # content digest -> nodes
+       drift.getTable()                            # rows of the drifted files
+    """
+
+    HEADER = ("File", "Nodes", "Count", "Diff")
+
+    #Logs, status outputs and package lists differ by nature and aren't compared.
+    #The package versions are compared by rpm.RpmMatrix.
+    EXCLUDED = ("rpm_qa.txt", "lustre_log.txt", "hastatus.txt")
+
+    def __init__(self, config, nodes = None):
+        self.__config = config
+        self.__nodes = list(nodes) if nodes is not None else list(config)
+        self.__digests = {}
+        self.__groups = {}
+
+    def digest(self, node, foi):
+        """The digest of a file of a node, computed once per file"""
+        if (node, foi) not in self.__digests:
+            self.__digests[(node, foi)] = digest(self.__config[node][foi])
+
+        return self.__digests[(node, foi)]
+
+    def groups(self, foi):
+        """The nodes per content of the file, ordered by the first node of each group
+
+           Nodes without the file are left out.
+        """
+        if foi not in self.__groups:
+            groups = OrderedDict()
+
+            for node in self.__nodes:
+                if foi in self.__config[node]:
+                    groups.setdefault(self.digest(node, foi), []).append(node)
+
+            self.__groups[foi] = groups
+
+        return self.__groups[foi]
+
+    def getFiles(self):
+        """All files of interest of the nodes, in the order they were collected, except EXCLUDED"""
+        files = OrderedDict()
+
+        for node in self.__nodes:
+            files.update((foi, None) for foi in self.__config[node] if foi not in self.EXCLUDED)
+
+        return list(files)
+
+    def getDriftedFiles(self):
+        return [foi for foi in self.getFiles() if len(self.groups(foi)) > 1]
+
+    def diff(self, foi, reference, node):
+        """Unified diff of the file between two nodes"""
+        return "".join(difflib.unified_diff(self.__config[reference][foi].splitlines(True),
+                                            self.__config[node][foi].splitlines(True),
+                                            fromfile=reference, tofile=node))
+
+    def getDrift(self, foi):
+        """The groups of a file as list of (nodes, diff)
+
+           The largest group is the reference and comes first with an empty diff.
+           The other groups are diffed against it by their first node.
+        """
+        groups = sorted(self.groups(foi).values(), key=len, reverse=True)
+
+        if not groups:
+            return []
+
+        reference = groups[0]
+        drift = [(reference, "")]
+
+        for nodes in groups[1:]:
+            drift.append((nodes, self.diff(foi, reference[0], nodes[0])))
+
+        return drift
+
+    def getTable(self, fois = None):
+        """One row per group of each drifted file: file, folded nodes, number of nodes and the diff"""
+        rows = []
+
+        for foi in fois if fois is not None else self.getDriftedFiles():
+            if len(self.groups(foi)) < 2:
+                continue
+
+            for nodes, diff in self.getDrift(foi):
+                rows.append((foi, fold(nodes), len(nodes), diff))
+
+        return rows
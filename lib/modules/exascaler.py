@@ -8,21 +8,52 @@ This module is for parsing the exascaler config file.
 
 '''
 
+import os
 import re
 import json
 
 from modules.lustreConfig import EXAScalerConfig
 from tempfile import NamedTemporaryFile
 from subprocess import Popen, PIPE, STDOUT
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from config import ConfigDict
-from functools import reduce
 from ClusterShell.NodeSet import NodeSet
+from modules.tools import memoize, ReportTable
+from modules.drift import ConfigDrift
+from modules.rpm import RpmInventory, RpmMatrix
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+#Sections of an ES5.x exascaler.conf, e.g. "[fs fs0]" or "[host node1]"
+ES5_SECTION = re.compile(r"^\[(?:fs|host|pool|zpool|sfa|ha|hsm|emf|rest) +[^\]]+\]", re.MULTILINE)
+
+def isES5Conf(esconf):
+    """Checks if the content is an ES5.x exascaler.conf, which isn't valid TOML"""
+    return bool(ES5_SECTION.search(esconf))
+
+def getRawConf(config: ConfigDict):
+    """Get the exascaler.conf of the first node that has one"""
+    for node in config:
+        if "exascaler.conf.raw" in config[node]:
+            return config[node]["exascaler.conf.raw"]
+    
+    return ""
 
 def es_config_loader(config: ConfigDict):
     
     print("\n    Loading and checking exascaler config")
     
+    # An ES5.x config never goes through the TOML parser.
+    # A parse error is raised to the caller, which prints the message.
+    if isES5Conf(getRawConf(config)):
+        return exascaler_conf_parser(config)
+    
     try:
         return exascaler_toml_parser(config)
     except TOMLParseError as e:
@@ -52,6 +83,8 @@ class es_config_interface:
     
     def __init__(self, config: ConfigDict):
         self._config_data = config
+        self._nodes = sorted(config, key=self._sortNodes)
+        self._drift = ConfigDrift(config, self._nodes)
         self._loadExaScalerConf()
 
           
@@ -59,6 +92,7 @@ class es_config_interface:
         subbed = re.sub('[\[\]]', '', s).lower()
         return any(c in '!@#$%^&*' for c in s), subbed  
     
+    @memoize
     def _compareConf(self, foi):  
         '''Compares all exascaler.conf files for a filesystem to be equal
         
@@ -69,11 +103,12 @@ class es_config_interface:
                 config file
         '''
         compare = defaultdict(list)
-        for node in self.getNodes():
-            compare[self._config_data[node][foi]].append(node)
+        for nodes in self._drift.groups(foi).values():
+            compare[self._config_data[nodes[0]][foi]] = nodes
             
         return compare
-            
+    
+    @memoize
     def _equalConf(self, foi):
         '''Checks if config file entries are equal
         
@@ -95,7 +130,10 @@ class es_config_interface:
         return compare
     
     def getNodes(self):
-        return sorted([node for node in self._config_data], key=self._sortNodes)
+        return self._nodes
+    
+    def getDrift(self):
+        return self._drift
     
     def getRawExaScalerConf(self):
         esconf = self._equalConf("exascaler.conf.raw")
@@ -106,17 +144,9 @@ class es_config_interface:
             return esconf
         
     def _loadExaScalerConf(self):
-        esconf = self.getRawExaScalerConf()
-        
-        temp = NamedTemporaryFile()  
-        temp.write(esconf.encode('ascii'))
-        temp.flush()
-        
-        self._load_conf(temp.name)
-
-        temp.close()
+        self._load_conf(self.getRawExaScalerConf())
 
-    def _load_conf(self, path: str):
+    def _load_conf(self, esconf: str):
         pass
     
     def getExaScalerType(self):
@@ -128,13 +158,21 @@ class es_config_interface:
     def getExaScalerVersionNum(self):
         return re.findall(r"(\d+\.?\d?\.?\d?-\w+)", self.getExaScalerVersion())[0]
 
+    @memoize
+    def getPackages(self, node):
+        """The installed packages of the node, parsed once"""
+        return RpmInventory(self._config_data[node]["rpm_qa.txt"])
+    
+    def getPackageMatrix(self, packages = None):
+        """The versions of the packages per node, see rpm.RpmMatrix"""
+        return RpmMatrix(OrderedDict((node, self.getPackages(node)) for node in self.getNodes()), packages)
+    
+    @memoize
     def getLustreVersion(self):
         compare = defaultdict(list)
         
         for node in self.getNodes():
-            rpms = self._config_data[node]["rpm_qa.txt"]
-            lustre_version = re.search(r"lustre-\d.+ddn.+(?=\.)", rpms, re.MULTILINE)
-            compare[lustre_version.group().strip()].append(node)
+            compare[self.getPackages(node).getLustre()].append(node)
             
         if len(compare) == 1:
             return list(compare.keys())[0]
@@ -153,8 +191,7 @@ class es_config_interface:
     
     def getLustreSettings(self):
         settings = self._exaconfig["global_settings"]["set_param_tunings"]
-        settings = reduce(lambda x,y: x + y, [i + ': ' + settings[i]+'\n' for i in settings])[:-1]
-        return settings
+        return "\n".join(i + ': ' + settings[i] for i in settings)
     
     def getTimezone(self):
         return self._exaconfig["global_settings"]["timezone"]
@@ -192,7 +229,95 @@ class es_config_interface:
     def getInterfaceList(self):
         return self._exaconfig["host_defaults_settings"]["nics"]
     
-    def getInterfaceConfig(self, host):        
+    def getInterfaceConfig(self, host):
+        """The interfaces of a host as ReportTable. For folded nodes (e.g. node[01-04]) one row per node."""
+        if "[" in host and "]" in host:
+            return self._getNodesInterfaceConfig(NodeSet(host))
+        
+        return self._getHostInterfaceConfig(host)
+    
+    def _getNodesInterfaceConfig(self, nodes):
+        header = ["Node"]
+        
+        for node in nodes:
+            for nic in self._exaconfig["hosts_settings"][node]["nics"].values():
+                nic = ConfigDict(nic)
+                if nic.device not in header:
+                    header.append(nic.device)
+                    
+                    if "gateway" in nic:
+                        header.append("Gateway")
+        
+        table = ReportTable(header)
+        
+        for node in nodes:
+            row = [node]
+            
+            for nic in self._exaconfig["hosts_settings"][node]["nics"].values():
+                nic = ConfigDict(nic)
+                row.append(nic.ip + "/" + str(self.convertNetmask(nic.netmask)))
+                
+                if "gateway" in nic:
+                    row.append(nic.gateway)
+            
+            table.append(row)
+        
+        return table
+    
+    def _getHostInterfaceConfig(self, host):
+        nics = self._exaconfig["hosts_settings"][host]["nics"]
+        gateway = any("gateway" in nics[nic] for nic in nics)
+        bonded = any(self._isBonded(nics[nic]) for nic in nics)
+        cfg = any(self._getNicConfig(nics[nic]) for nic in nics)
+        
+        header = ["Interface", "IP", "Netmask"]
+        
+        if gateway:
+            header.append("Gateway")
+            
+        if bonded:
+            header.append("Bonded")
+            
+        if cfg:
+            header.append("Config")
+        
+        table = ReportTable(header)
+        
+        for nic_str in nics:
+            nic = ConfigDict(nics[nic_str])
+            if "ip" not in nic:
+                continue
+            
+            if "ipmi" in nic_str:
+                nic.update({"device": nic_str})
+            
+            row = [nic.device, nic.ip, nic.netmask]
+            
+            if "gateway" in nic:
+                row.append(nic.gateway)
+            elif gateway:
+                row.append("--")
+            
+            if self._isBonded(nic):
+                row.append(",".join(nic.slaves.split(" ")))
+            elif bonded:
+                row.append("--")
+            
+            nic_cfg = self._getNicConfig(nic)
+            
+            if nic_cfg:
+                row.append(nic_cfg)
+            elif cfg:
+                row.append("--")
+            
+            table.append(row)
+        
+        return table
+    
+    def _isBonded(self, nic):
+        pass
+    
+    def _getNicConfig(self, nic):
         pass
         
     def convertNetmask(self, netmask):
@@ -203,8 +328,8 @@ class exascaler_conf_parser(es_config_interface):
     # def __init__(self, config: ConfigDict):
     #     super().__init__(config)
     
-    def _load_conf(self, path):        
-        self._exaconfig = EXAScalerConfig(path).to_dict()
+    def _load_conf(self, esconf):        
+        self._exaconfig = EXAScalerConfig(config_string=esconf).to_dict()
     
     def getExaScalerType(self):
         return self._ES5X
@@ -229,6 +354,7 @@ class exascaler_conf_parser(es_config_interface):
             
             return version_num
 
+    @memoize
     def getModuleSettings(self):
         module = self._equalConf("etc.modprobe.d.lustre.conf")
         
@@ -241,109 +367,137 @@ class exascaler_conf_parser(es_config_interface):
     def getModuleSetting(self, node):
         return self._config_data[node]["etc.modprobe.d.lustre.conf"]
     
-    def getInterfaceConfig(self, host):        
-        header = []
-        listData = ""
+    def _isBonded(self, nic):
+        return nic["is_bonded"]
+    
+    def _getNicConfig(self, nic):
+        return nic.get("cfg")
+    
+#Used for ES6.x
+class exascaler_toml_parser(es_config_interface):
+    
+    ES_CONFIG_SHOW = "lib/es-config-show"
+    
+    #Tables of the exascaler.toml and their key in the config
+    SECTIONS = {"global": "global_settings",
+                "fs": "fs_settings",
+                "host": "hosts_settings",
+                "hosts": "hosts_settings",
+                "host_defaults": "host_defaults_settings",
+                "pool": "pool_settings",
+                "zpool": "zpool_settings",
+                "sfa": "sfa_settings",
+                "ha": "ha_settings",
+                "hsm": "hsm_settings",
+                "emf": "emf_settings",
+                "rest": "rest_settings"}
+    
+    #Settings read by the getters and their types
+    GLOBAL_SETTINGS = {"fs_list": list, "set_param_tunings": dict, "timezone": str, "ntp_list": list}
+    FS_SETTINGS = {"mds_list": list, "oss_list": list, "mdt_list": dict, "ost_list": dict}
+    NIC_SETTINGS = {"device": str, "ip": str, "netmask": str, "bonding_mode": (str, type(None)), "cfg": (dict, type(None))}
+    
+    def _load_conf(self, esconf):
+        """Loads the exascaler.toml in-process. es-config-show is only used, if there is no
+           TOML module or settings used by the report are missing.
+        """
+        if tomllib is None:
+            self._exaconfig = self._show(esconf)
+            return
         
-        #for host in hosts:
-        if "[" in host and "]" in host:
-            nodes = NodeSet(host)
+        try:
+            toml = tomllib.loads(esconf)
+        except tomllib.TOMLDecodeError:
+            raise NoTOMLFileError
+        
+        self._exaconfig = self._normalize(toml)
+        missing = self._missingSettings()
+        
+        if missing:
+            if os.path.isfile(self.ES_CONFIG_SHOW):
+                self._exaconfig = self._show(esconf)
+            else:
+                raise TOMLParseError("ERROR: Missing settings in exascaler.toml: {}".format(", ".join(missing)))
+    
+    def _normalize(self, toml):
+        """Converts the tables of the exascaler.toml into the structure of es-config-show"""
+        exaconfig = {setting: {} for setting in set(self.SECTIONS.values())}
+        exaconfig["host_defaults_settings"] = None
+        
+        for section, value in toml.items():
+            exaconfig[self.SECTIONS.get(section, section + "_settings")] = value
+        
+        # The hosts inherit the settings they don't set from host_defaults
+        defaults = exaconfig["host_defaults_settings"] or {}
+        
+        for host, settings in exaconfig["hosts_settings"].items():
+            exaconfig["hosts_settings"][host] = dict(defaults, **settings)
+        
+        return exaconfig
+    
+    def _missingSettings(self):
+        """The settings read by the getters, that are missing or of the wrong type
+        
+           Anything es-config-show derives and the exascaler.toml doesn't set is
+           listed here, so the config is loaded by es-config-show instead.
+        """
+        missing = []
+        
+        def check(settings, keys, path):
+            if not isinstance(settings, dict):
+                missing.append(path)
+                return False
             
-            header.append("Node")
-            #create header
-            for node in nodes:
-                for nic in self._exaconfig["hosts_settings"][node]["nics"]:
-                    nic = ConfigDict(self._exaconfig["hosts_settings"][node]["nics"][nic])
-                    if nic.device not in header:
-                        header.append(nic.device)
-                    
-                        if "gateway" in nic:
-                            header.append("Gateway")
+            for key, kind in keys.items():
+                if key not in settings or not isinstance(settings[key], kind):
+                    missing.append("{}.{}".format(path, key))
             
-            temp = "<tr>"
-            for h in header:
-                temp = temp + "<td>{}</td>".format(h)
-                
-            header = temp + "</tr>"
-              
-            #create listData
-            for node in nodes:                
-                listData = listData + "<tr><td>{}</td>".format(node)
-                
-                for nic in self._exaconfig["hosts_settings"][node]["nics"]:
-                    nic = ConfigDict(self._exaconfig["hosts_settings"][node]["nics"][nic])
-                    
-                    listData = listData + "<td>{}</td>".format(nic.ip + "/" + str(self.convertNetmask(nic.netmask)))
-                    
-                    if "gateway" in nic:
-                        listData = listData + "<td>{}</td>".format(nic.gateway)
+            return True
+        
+        if check(self._exaconfig["global_settings"], self.GLOBAL_SETTINGS, "global"):
+            if "global.fs_list" not in missing:
+                for fs in self._exaconfig["global_settings"]["fs_list"]:
+                    check(self._exaconfig["fs_settings"].get(fs), self.FS_SETTINGS, "fs." + fs)
             
-                listData = listData + "</tr>"
-                
+            # The tunings are joined as strings by getLustreSettings
+            if "global.set_param_tunings" not in missing:
+                for tuning, value in self._exaconfig["global_settings"]["set_param_tunings"].items():
+                    if not isinstance(value, str):
+                        missing.append("global.set_param_tunings." + tuning)
+        
+        check(self._exaconfig["host_defaults_settings"], {"nics": (list, dict)}, "host_defaults")
+        
+        for host, settings in self._exaconfig["hosts_settings"].items():
+            path = "hosts." + host
             
-            summary = "<table>" + header + listData + "</table>"
-            return summary
-                               
-        else:
-            gateway = [nic for nic in self._exaconfig["hosts_settings"][host]["nics"] if "gateway" in self._exaconfig["hosts_settings"][host]["nics"][nic]]
-            bonded = [nic for nic in self._exaconfig["hosts_settings"][host]["nics"] if self._exaconfig["hosts_settings"][host]["nics"][nic]["is_bonded"]]
-            cfg = [nic for nic in self._exaconfig["hosts_settings"][host]["nics"] if "cfg" in self._exaconfig["hosts_settings"][host]["nics"][nic]]
-
-            header = "<tr><td>Interface</td><td>IP</td><td>Netmask</td>"
+            if not check(settings, {"nics": dict}, path) or path + ".nics" in missing:
+                continue
             
-            if gateway:
-                header = header + "<td>Gateway</td>"
-                
-            if bonded:
-                header = header + "<td>Bonded</td>"
+            for nic, nicSettings in settings["nics"].items():
+                nicPath = "{}.nics.{}".format(path, nic)
                 
-            if cfg:
-                header = header + "<td>Config</td>"
-            
-            header = header + "</tr>"
-            
-
-            for nic in self._exaconfig["hosts_settings"][host]["nics"]:
-                nic_str = nic
-                nic = ConfigDict(self._exaconfig["hosts_settings"][host]["nics"][nic_str])
-                if "ip" not in nic:
+                if not check(nicSettings, self.NIC_SETTINGS, nicPath):
                     continue
                 
-                if "ipmi" in nic_str:
-                    nic.update({"device": nic_str})
+                if nicSettings.get("bonding_mode"):
+                    check(nicSettings, {"slaves": str}, nicPath)
                 
-                listData = listData + "<tr><td>{}</td><td>{}</td><td>{}</td>".format(nic.device,
-                                                                             nic.ip,
-                                                                             nic.netmask)
-            
-                if "gateway" in nic:
-                    listData = listData + "<td>{}</td>".format(nic.gateway)
-                elif "gateway" not in nic and gateway:
-                    listData = listData + "<td>--</td>"   
-                    
-                if nic.is_bonded:
-                    listData = listData + "<td>{}</td>".format(",".join(nic.slaves.split(" ")))
-                elif not nic.is_bonded and bonded:
-                    listData = listData + "<td>--</td>"    
-                    
-                if "cfg" in nic:
-                    listData = listData + "<td>{}</td>".format(nic.cfg)
-                elif "cfg" not in nic and cfg == None:
-                    listData = listData + "<td>--</td>"    
-                    
-                listData = listData + "</tr>"
-                   
-            summary = "<table>" + header + listData + "</table>"
-            
-            return summary
-    
-#Used for ES6.x
-class exascaler_toml_parser(es_config_interface):
+                if isinstance(nicSettings.get("cfg"), dict) and not all(isinstance(v, dict) for v in nicSettings["cfg"].values()):
+                    missing.append(nicPath + ".cfg")
+        
+        return missing
     
-    def _load_conf(self, path):
-        exatoml = Popen(["lib/es-config-show", '-c', path], stdout=PIPE, stderr=STDOUT, text=True)
+    def _show(self, esconf):
+        """Loads the exascaler.toml with es-config-show"""
+        temp = NamedTemporaryFile()  
+        temp.write(esconf.encode('ascii'))
+        temp.flush()
+        
+        exatoml = Popen([self.ES_CONFIG_SHOW, '-c', temp.name], stdout=PIPE, stderr=STDOUT, text=True)
         
         result = exatoml.communicate()
+        
+        temp.close()
 
         if "ERROR" in result[0]:
             if not "TOML" in result[0]:
@@ -351,7 +505,7 @@ class exascaler_toml_parser(es_config_interface):
             else:
                 raise NoTOMLFileError
         
-        self._exaconfig = json.loads(result[0])
+        return json.loads(result[0])
         
     def getExaScalerType(self):
         return self._ES6X
@@ -376,6 +530,7 @@ class exascaler_toml_parser(es_config_interface):
             
             return version_num
         
+    @memoize
     def getModuleSettings(self):
         module = self._equalConf("lustre.conf")
         
@@ -388,107 +543,19 @@ class exascaler_toml_parser(es_config_interface):
     def getModuleSetting(self, node):
         return self._config_data[node]["lustre.conf"]
     
-    def getInterfaceConfig(self, host):        
-        header = []
-        listData = ""
+    def _isBonded(self, nic):
+        return nic["bonding_mode"]
+    
+    def _getNicConfig(self, nic):
+        if not nic.get("cfg"):
+            return None
         
-        #for host in hosts:
-        if "[" in host and "]" in host:
-            nodes = NodeSet(host)
-            
-            header.append("Node")
-            #create header
-            for node in nodes:
-                for nic in self._exaconfig["hosts_settings"][node]["nics"]:
-                    nic = ConfigDict(self._exaconfig["hosts_settings"][node]["nics"][nic])
-                    if nic.device not in header:
-                        header.append(nic.device)
-                    
-                        if "gateway" in nic:
-                            header.append("Gateway")
-            
-            temp = "<tr>"
-            for h in header:
-                temp = temp + "<td>{}</td>".format(h)
-                
-            header = temp + "</tr>"
-              
-            #create listData
-            for node in nodes:                
-                listData = listData + "<tr><td>{}</td>".format(node)
-                
-                for nic in self._exaconfig["hosts_settings"][node]["nics"]:
-                    nic = ConfigDict(self._exaconfig["hosts_settings"][node]["nics"][nic])
-                    
-                    listData = listData + "<td>{}</td>".format(nic.ip + "/" + str(self.convertNetmask(nic.netmask)))
-                    
-                    if "gateway" in nic:
-                        listData = listData + "<td>{}</td>".format(nic.gateway)
-            
-                listData = listData + "</tr>"
-                
-            
-            summary = "<table>" + header + listData + "</table>"
-            return summary
-                               
-        else:
-            gateway = [nic for nic in self._exaconfig["hosts_settings"][host]["nics"] if "gateway" in self._exaconfig["hosts_settings"][host]["nics"][nic]]
-            bonded = [nic for nic in self._exaconfig["hosts_settings"][host]["nics"] if self._exaconfig["hosts_settings"][host]["nics"][nic]["bonding_mode"] != None]
-            cfg = [nic for nic in self._exaconfig["hosts_settings"][host]["nics"] if "cfg" in self._exaconfig["hosts_settings"][host]["nics"][nic]]
-
-            header = "<tr><td>Interface</td><td>IP</td><td>Netmask</td>"
-            
-            if gateway:
-                header = header + "<td>Gateway</td>"
-                
-            if bonded:
-                header = header + "<td>Bonded</td>"
-                
-            if cfg:
-                header = header + "<td>Config</td>"
-            
-            header = header + "</tr>"
-            
-
-            for nic in self._exaconfig["hosts_settings"][host]["nics"]:
-                nic_str = nic
-                nic = ConfigDict(self._exaconfig["hosts_settings"][host]["nics"][nic_str])
-                if "ip" not in nic:
-                    continue
-                
-                if "ipmi" in nic_str:
-                    nic.update({"device": nic_str})
-                
-                listData = listData + "<tr><td>{}</td><td>{}</td><td>{}</td>".format(nic.device,
-                                                                             nic.ip,
-                                                                             nic.netmask)
-            
-                if "gateway" in nic:
-                    listData = listData + "<td>{}</td>".format(nic.gateway)
-                elif "gateway" not in nic and gateway:
-                    listData = listData + "<td>--</td>"   
-                    
-                if nic.bonding_mode:
-                    listData = listData + "<td>{}</td>".format(",".join(nic.slaves.split(" ")))
-                elif not nic.bonding_mode and bonded:
-                    listData = listData + "<td>--</td>"
-                    
-                if nic.cfg:
-                    nic_cfg = ""
-                    for k, v in nic.cfg.items():
-                        if len(nic.cfg[k].items()) > 0:
-                            for key, value in nic.cfg[k].items():
-                                nic_cfg += "{}={}\n".format(key,value)
-                        else:
-                            nic_cfg += "{}={}\n".format(k,v)
-                    
-                    listData = listData + "<td>{}</td>".format(nic_cfg.strip())
-                elif not nic.cfg and cfg:
-                    listData = listData + "<td>--</td>"    
-                    
-                listData = listData + "</tr>"
-                   
-            summary = "<table>" + header + listData + "</table>"
-            
-            return summary
+        nic_cfg = []
+        for k, v in nic["cfg"].items():
+            if len(v.items()) > 0:
+                nic_cfg += ["{}={}".format(key, value) for key, value in v.items()]
+            else:
+                nic_cfg.append("{}={}".format(k, v))
+        
+        return "\n".join(nic_cfg)
     
@@ -4,13 +4,24 @@ Created on 13 Dec 2017
 @author: mwolf
 
 This module is for parsing the output of gsctl showall.
-It currently excepts the tar file created by gsctl.
+It currently excepts the tar file created by gsctl or the extracted
+directory of it. Several archives (one per cluster) are parsed in a
+process pool.
 
 TODO: mmlsconfig, host files, 
 '''
 
-import tarfile
-from io import StringIO
+import os
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from modules.tools import Envelope, memoize
+from modules.archive import openTar
+
+def parseCluster(filename):
+    """Parse a single gsctl archive. Used to parse several archives in a process pool."""
+    return parse_gsctl(filename).getData()[0]
 
 class parse_gsctl():
     
@@ -60,221 +71,313 @@ class parse_gsctl():
                    ["-A", "", "Autostart"],
                    ["-c", "", "Config file"]]
 
-    gsctl_data = {}
-    
-    def __init__(self, gsctl):
+    MMLSFS_DEFAULTS = {opt[0]: opt[1] for opt in MMLSFS}
+    MMCRCLUSTER_DEFAULTS = {opt[0]: opt[1] for opt in MMCRCLUSTER}
+
+    def __init__(self, gsctl, data = None):
+        self.gsctl_data = data if data else {}
+        
+        if isinstance(gsctl, str):
+            gsctl = [gsctl]
+        
         try:
-            for filename in gsctl:
-                print("- {0}".format(filename))
-                self.tar = tarfile.open(filename, "r")
-                m = filter(self.findFOI,self.tar.getmembers())
-                
-                self.gsctl_data[len(self.gsctl_data)] = {}
-                index = len(self.gsctl_data)-1
-                
-                for member in m:
-                    foi = [x for a, x in enumerate(self.FOI) if x in member.name][0]
-                    
-                    if foi == "gpfs_any" and not member.name.endswith("mmlsdisk.txt"):
-                        if member.name.endswith("gpfs_any.txt"):
-                            pass
-                        #else: 
-                        #    continue
-                    
-                    f = self.tar.extractfile(member)
-                    
-                    if f:
-                        content = f.read().decode("utf-8")
-                        start = content.find("STDOUT") + 7
-                        stop = content.find("STDERR")
-                        content = content[start:stop].strip()
-                        self.gsctl_data[index][foi] = content
-                    #print "%s has content:\n%s\n" %(foi, content)
-                
-                print(" \- reading information for: ")
-                print("   -> Initial config")    
-                self.gsctl_data[index]["initial_config"] = self.initialConfig(index)
-                print("   -> mmlsconfig") 
-                self.gsctl_data[index]["config"] = self.mmlsconfig(index)
-                print("   -> tiebreakerDisks") 
-                self.gsctl_data[index]["tiebreakerdisks"] = self.tiebreakerDisks(index)
-                print("   -> Cluster name")
-                self.gsctl_data[index]["cluster_name"] = self.getClusterName(index)  
-                print("   -> mmlscluster")
-                self.gsctl_data[index]["cluster"] = self.mmcrcluster(index)
-                print("   -> Server list")
-                self.gsctl_data[index]["serverlist"] = self.getNodeList(index)
-                print("   -> Node list") 
-                self.gsctl_data[index]["nodelist"] = self.getNodeList(index, nodesOnly=True)
-                print("   -> Client list")
-                self.gsctl_data[index]["clientlist"] = self.getNodeList(index, server=False)
-                print("   -> Filesystems")
-                self.gsctl_data[index]["filesystems"] = self.getFilesystems(index)
-                self.gsctl_data[index]["stanza"] = ""
-                for filesystem in self.getFilesystems(index):
-                        print("      \- {0}".format(filesystem))
-                        print("        -> Creating stanza")
-                        self.gsctl_data[index]["stanza_{0}".format(filesystem)] = self.getStanza(filesystem, index)
-                        self.gsctl_data[index]["stanza"] += self.getStanza(filesystem, index) + "\n"
-                        print("        -> Creating mmcrfs command")
-                        self.gsctl_data[index]["filesystem_{0}".format(filesystem)] = self.mmcrfs(filesystem, index)
-                
-                self.gsctl_data[index]["stanza"] = self.gsctl_data[index]["stanza"][:len(self.gsctl_data[index]["stanza"]) - 1]
+            # Each archive holds one cluster, so the archives are parsed side by side
+            if not data and len(gsctl) > 1:
+                with ProcessPoolExecutor(max_workers=min(len(gsctl), os.cpu_count())) as pool:
+                    for index, clusterData in enumerate(pool.map(parseCluster, gsctl)):
+                        self.gsctl_data[index] = clusterData
+            elif not data:
+                for filename in gsctl:
+                    self.__parse(filename)
                 
         except Exception as e:
             print(e)
             exit()
 
+    def __parse(self, filename):
+        """Parse a gsctl archive into the data of the next cluster index"""
+        print("- {0}".format(filename))
+        index = len(self.gsctl_data)
+        self.gsctl_data[index] = {}
+        
+        with openTar(filename) as tar:
+            for member in filter(self.findFOI, tar):
+                foi = [x for a, x in enumerate(self.FOI) if x in member.name][0]
+                
+                if foi == "gpfs_any" and not member.name.endswith("mmlsdisk.txt"):
+                    if member.name.endswith("gpfs_any.txt"):
+                        pass
+                    #else: 
+                    #    continue
+                
+                f = tar.extractfile(member)
+                
+                if f:
+                    self.gsctl_data[index][foi] = Envelope(f.read()).getContent().strip()
+                #print "%s has content:\n%s\n" %(foi, content)
+        
+        print(" \- reading information for: ")
+        print("   -> Initial config")    
+        self.gsctl_data[index]["initial_config"] = self.initialConfig(index)
+        print("   -> mmlsconfig") 
+        self.gsctl_data[index]["config"] = self.mmlsconfig(index)
+        print("   -> tiebreakerDisks") 
+        self.gsctl_data[index]["tiebreakerdisks"] = self.tiebreakerDisks(index)
+        print("   -> Cluster name")
+        self.gsctl_data[index]["cluster_name"] = self.getClusterName(index)  
+        print("   -> mmlscluster")
+        self.gsctl_data[index]["cluster"] = self.mmcrcluster(index)
+        print("   -> Server list")
+        self.gsctl_data[index]["serverlist"] = self.getNodeList(index)
+        print("   -> Node list") 
+        self.gsctl_data[index]["nodelist"] = self.getNodeList(index, nodesOnly=True)
+        print("   -> Client list")
+        self.gsctl_data[index]["clientlist"] = self.getNodeList(index, server=False)
+        print("   -> Filesystems")
+        self.gsctl_data[index]["filesystems"] = self.getFilesystems(index)
+        self.gsctl_data[index]["stanza"] = ""
+        for filesystem in self.getFilesystems(index):
+                print("      \- {0}".format(filesystem))
+                print("        -> Creating stanza")
+                self.gsctl_data[index]["stanza_{0}".format(filesystem)] = self.getStanza(filesystem, index)
+                self.gsctl_data[index]["stanza"] += self.gsctl_data[index]["stanza_{0}".format(filesystem)] + "\n"
+                print("        -> Creating mmcrfs command")
+                self.gsctl_data[index]["filesystem_{0}".format(filesystem)] = self.mmcrfs(filesystem, index)
+        
+        self.gsctl_data[index]["stanza"] = self.gsctl_data[index]["stanza"][:len(self.gsctl_data[index]["stanza"]) - 1]
+
     def getData(self):
         """Get the discovered data from the gsctl"""
         return self.gsctl_data
+    
+    def getClusters(self):
+        """Get the data of each cluster by the cluster name"""
+        return OrderedDict((data.get("cluster_name") or str(index), data) for index, data in self.gsctl_data.items())
 
     def getFilesystems(self, index):
         """Get all available filesystems"""
+        return self.getConfig(index)["filesystems"]
+    
+    @memoize
+    def getConfig(self, index):
+        """Tokenize mmlsconfig
         
-        filesystems=[]
-        mmlsconfig = StringIO(self.gsctl_data[index]["mmlsconfig"])
+           Returns
+           -------
+           dict 
+                "options": list of (section, split line) for all lines with a value
+                "filesystems": the filesystems listed as /dev/<name>
+        """
+        config = {"options": [], "filesystems": []}
+        section = ""
         
-        for line in mmlsconfig:
+        for line in self.gsctl_data[index]["mmlsconfig"].split("\n"):
+            option = line.split()
+            
+            if line[:1] == "[":
+                section = line.strip()[1:-1].lower()
+            
             if line.find("/dev") != -1:
-                filesystems.append(line[5:].strip())
+                config["filesystems"].append(line[5:].strip())
+            
+            if len(option) > 1:
+                config["options"].append((section, option))
+        
+        return config
+    
+    @memoize
+    def getCluster(self, index):
+        """Tokenize mmlscluster
+        
+           Returns
+           -------
+           dict 
+                "attributes": "<label>:" -> split line, e.g. "GPFS cluster name:"
+                "nodes": split lines of the node table
+        """
+        cluster = {"attributes": {}, "nodes": []}
+        
+        for line in self.gsctl_data[index]["mmlscluster"].split("\n"):
+            option = line.split()
+            
+            if len(option) > 1:
+                if line.find(":") != -1:
+                    cluster["attributes"].setdefault(line[:line.find(":") + 1].strip(), option)
                 
-        return filesystems
+                if option[0].isdigit():
+                    cluster["nodes"].append(option)
+        
+        return cluster
+    
+    @memoize
+    def getFilesystemAttributes(self, index):
+        """Tokenize mmlsfs
+        
+           Returns
+           -------
+           OrderedDict 
+                the /dev/<name> line of each filesystem -> split lines of its attributes
+        """
+        attributes = OrderedDict()
+        rows = None
+        
+        for line in self.gsctl_data[index]["mmlsfs"].split("\n"):
+            if line.find("/dev/") != -1:
+                rows = attributes.setdefault(line, [])
+                continue
+            
+            option = line.split()
+            if rows is not None and len(option) > 1:
+                rows.append(option)
+        
+        return attributes
 
+    @memoize
+    def getNSDDevices(self, index):
+        """Device of each NSD from mmlsnsd -m. The first node listed for an NSD wins."""
+        devices = {}
+        
+        for line in self.gsctl_data[index]["mmlsnsd_m"].split("\n"):
+            nsd = line.split()
+            if len(nsd) > 2:
+                devices.setdefault(nsd[0], nsd[2])
+        
+        return devices
+    
+    @memoize
+    def getNSDServers(self, index):
+        """Servers of each NSD from mmlsnsd -L"""
+        servers = {}
+        
+        for line in self.gsctl_data[index]["mmlsnsd_l"].split("\n"):
+            nsd = line.split()
+            if len(nsd) > 3:
+                servers.setdefault(nsd[1], nsd[3])
+        
+        return servers
+    
+    @memoize
+    def getDisks(self, index):
+        """The NSDs of each filesystem from mmlsdisk
+        
+           Returns
+           -------
+           OrderedDict 
+                the mmlsdisk command line -> list of the split disk lines
+        """
+        disks = OrderedDict()
+        rows = None
+        
+        for line in self.gsctl_data[index]["gpfs_any_mmlsdisk"].split("\n"):
+            if line.find("mmlsdisk") != -1:
+                rows = disks.setdefault(line, [])
+            elif line.find("Number") != -1:
+                rows = None
+            elif rows is not None:
+                disk = line.split()
+                if len(disk) > 2 and disk[1] == "nsd":
+                    rows.append(disk)
+        
+        return disks
 
     def getStanza(self, fs, index):
         """Reverse creation of the stanza file from the given filesystem"""
         
-        found = False
-        stanza = ""
-        mmlsdisk = StringIO(self.gsctl_data[index]["gpfs_any_mmlsdisk"])
-        mmlsnsd_m = StringIO(self.gsctl_data[index]["mmlsnsd_m"])
-        mmlsnsd_l = StringIO(self.gsctl_data[index]["mmlsnsd_l"])
+        stanza = []
+        devices = self.getNSDDevices(index)
+        servers = self.getNSDServers(index)
+        disks = next((rows for command, rows in self.getDisks(index).items() if command.find(fs) != -1), [])
         
-        for line in mmlsdisk:
-            if line.find("mmlsdisk") != -1 and line.find(fs) != -1:
-                found = True
-            elif line.find("Number") != -1:
-                if found == True:
-                    return stanza.strip()
+        for disk in disks:
+            device = devices.get(disk[0], "")
+            server = servers.get(disk[0], "")
             
-            if found:
-                disk = line.split()
-                if len(line.split()) > 2 and line.split()[1] == "nsd":
-                    
-                    for nsd in mmlsnsd_m:
-                        if nsd.find(disk[0]) != -1:
-                            device = nsd.split()[2]
-                            break
-                        
-                    for nsd in mmlsnsd_l:
-                        if nsd.find(disk[0]) != -1:
-                            server = nsd.split()[3]
-                            break
-                    
-                    if disk[4] == "Yes" and disk[5] == "Yes":
-                        usage = "dataAndMetadata"
-                    elif disk[4] == "Yes" and disk[5] == "No":
-                        usage = "metadataOnly"
-                    elif disk[4] == "No" and disk[5] == "Yes":
-                        usage = "dataOnly" 
-                    
-                    for s in server.split(","):
-                        d = s.split(".")
-                        if not d[0].isdigit():
-                            server = server.replace(s,d[0])
-                    
-                    stanza = "{0}%nsd: device={1} nsd={2} servers={3} usage={4} failureGroup={5} pool={6}\n".format(stanza, device, disk[0].split(".")[0], server, usage, disk[3], disk[9])
+            if disk[4] == "Yes" and disk[5] == "Yes":
+                usage = "dataAndMetadata"
+            elif disk[4] == "Yes" and disk[5] == "No":
+                usage = "metadataOnly"
+            elif disk[4] == "No" and disk[5] == "Yes":
+                usage = "dataOnly" 
+            
+            for s in server.split(","):
+                d = s.split(".")
+                if not d[0].isdigit():
+                    server = server.replace(s,d[0])
+            
+            stanza.append("%nsd: device={0} nsd={1} servers={2} usage={3} failureGroup={4} pool={5}".format(device, disk[0].split(".")[0], server, usage, disk[3], disk[9]))
  
-        return stanza.strip()
+        return "\n".join(stanza).strip()
         
     def mmcrfs(self, fs, index, full=False):
         """Reverse creation of the options for mmcrfs"""
         
-        found = False
         mmcrfs = "mmcrfs {0} -F stanza".format(fs)
-        mmlsfs = StringIO(self.gsctl_data[index]["mmlsfs"])
         
-        for line in mmlsfs:
-            if line.find("/dev/") != -1:
-                if line.find(fs) != -1:
-                    found = True 
-                    continue
-                else:
-                    found = False
-            if found:
-                option = line.split()
-                if len(line.split()) > 1:
-                    default = self.getDefaultMMLSFSOption(option[0])
-                    if default != None:
-                        if full or default != option[1]:
-                            if option[0] == "-Q" and option[1] != "none":
-                                option[1] = "yes"
-    
-                            mmcrfs = "{0} {1} {2}".format(mmcrfs, option[0], option[1])   
+        for device, attributes in self.getFilesystemAttributes(index).items():
+            if device.find(fs) == -1:
+                continue
+            
+            for option in attributes:
+                default = self.getDefaultMMLSFSOption(option[0])
+                if default != None:
+                    if full or default != option[1]:
+                        value = option[1]
+                        if option[0] == "-Q" and value != "none":
+                            value = "yes"
+
+                        mmcrfs = "{0} {1} {2}".format(mmcrfs, option[0], value)   
                              
         return mmcrfs.strip()
 
     def getNodeList(self, index, server=True, nodesOnly=False):
         """Get nodes in the cluster"""
         
-        nodelist = ""
-        mmlscluster = StringIO(self.gsctl_data[index]["mmlscluster"])
-        #print(self.gsctl_data[index]["mmlscluster"])
-        for line in mmlscluster:
-            option = line.split()
-            if len(line.split()) > 1:
-                if option[0].isdigit() and len(option) == 5 and server:
-                    if nodesOnly:
-                        nodelist = "{0}{1}\n".format(nodelist, option[1])
-                        continue
-                    
-                    nodelist = "{0}{1}:{2}".format(nodelist, option[1], option[4])
-                    if option[1] != option[3]:
-                        nodelist = "{0}:{1}".format(nodelist, option[3])
-                    nodelist = "{0}\n".format(nodelist)
-                elif option[0].isdigit() and len(option) == 4 and not server:
-                    nodelist = "{0}{1}\n".format(nodelist, option[1])
-        
-        return nodelist.strip()
+        servers, nodes, clients = self.getNodeLists(index)
+        
+        if not server:
+            return clients
+        
+        return nodes if nodesOnly else servers
+    
+    @memoize
+    def getNodeLists(self, index):
+        """Get the server list, the node list and the client list in one pass over the nodes"""
+        
+        servers = []
+        nodes = []
+        clients = []
+        
+        for option in self.getCluster(index)["nodes"]:
+            if len(option) == 5:
+                nodes.append(option[1])
+                
+                server = "{0}:{1}".format(option[1], option[4])
+                if option[1] != option[3]:
+                    server = "{0}:{1}".format(server, option[3])
+                servers.append(server)
+            elif len(option) == 4:
+                clients.append(option[1])
+        
+        return "\n".join(servers), "\n".join(nodes), "\n".join(clients)
     
     def initialConfig(self, index):
         """Reverse creation of the config for mmcrcluster"""
         
         config = ""
-        section = ""
-        mmlsconfig = StringIO(self.gsctl_data[index]["mmlsconfig"])
         
-        for line in mmlsconfig:
-            option = line.split()
-            
-            if line[:1] == "[":
-                section = line[1:len(line)-2].lower()
-            
-            if len(line.split()) > 1 and (section == "common" or section == ""):
-                if option[0].lower() == "pagepool":
-                    config = '''{0}{1} {2}\n'''.format(config, option[0], option[1])
-                if option[0].lower() == "maxmbps":
+        for section, option in self.getConfig(index)["options"]:
+            if section == "common" or section == "":
+                if option[0].lower() in ("pagepool", "maxmbps", "maxblocksize"):
                     config = '''{0}{1} {2}\n'''.format(config, option[0], option[1])
-                if option[0].lower() == "maxblocksize":
-                    config = '''{0}{1} {2}\n'''.format(config, option[0], option[1])
-                    
         
         return config.strip()
                     
     def tiebreakerDisks(self, index): 
          
         config = ""
-        section = ""
-        mmlsconfig = StringIO(self.gsctl_data[index]["mmlsconfig"])
         
-        for line in mmlsconfig:
-            option = line.split()
-            
-            if line[:1] == "[":
-                section = line[1:len(line)-2].lower()
-            
-            if len(line.split()) > 1 and (section == "common" or section == ""):
+        for section, option in self.getConfig(index)["options"]:
+            if section == "common" or section == "":
                 if option[0].lower() == "tiebreakerdisks":
                     config = '''{0}{1}\n'''.format(config, option[1])
             
@@ -284,58 +387,43 @@ class parse_gsctl():
         return self.gsctl_data[index]["mmlsconfig"]
     
     def getClusterName(self, index):
-        mmlscluster = StringIO(self.gsctl_data[index]["mmlscluster"])
+        name = self.getCluster(index)["attributes"].get("GPFS cluster name:")
         
-        for line in mmlscluster:
-            option = line.split()
-            if line.find("GPFS cluster name:") != -1:
-                return option[3]
-    
-        return ""
+        return name[3] if name else ""
         
     def mmcrcluster(self, index):
         """Reverse creation of the options for mmcrcluster"""
         
         mmcrcluster = "mmcrcluster -N serverList "
-        mmlscluster = StringIO(self.gsctl_data[index]["mmlscluster"])
-        mmlsconfig = StringIO(self.gsctl_data[index]["mmlsconfig"])
+        attributes = self.getCluster(index)["attributes"]
         
-        for line in mmlscluster:
-            option = line.split()
-            if len(line.split()) > 1:
-                if line.find("GPFS cluster name:") != -1:
-                    cluster_name = option[3]
-                if line.find("Remote shell command:") != -1:
-                    cluster_rsh = option[3]
-                if line.find("Remote file copy command:") != -1:
-                    cluster_rcp = option[4]
-                if line.find("Repository type:") != -1:
-                    cluster_repository = option[2]
-                if line.find("Primary Server:") != -1:
-                    cluster_primary = option[1]
-                if line.find("Secondary Server:") != -1:
-                    cluster_secondary = option[1]
-        
-        for line in mmlsconfig:
-            option = line.split()
-            if len(line.split()) > 1:
-                if option[0] == "autoload":
-                    cluster_autostart = True
+        def attribute(label, field):
+            return attributes[label][field] if label in attributes else None
+        
+        cluster_name = attribute("GPFS cluster name:", 3)
+        cluster_rsh = attribute("Remote shell command:", 3)
+        cluster_rcp = attribute("Remote file copy command:", 4)
+        cluster_primary = attribute("Primary Server:", 1)
+        cluster_secondary = attribute("Secondary Server:", 1)
         
-        if "cluster_repository" not in locals():
-            mmcrcluster = mmcrcluster + "--ccr-disable -p {0} ".format(cluster_primary)
-            if cluster_secondary and cluster_secondary != None:
+        # Attributes missing in the output are left out instead of writing "None"
+        if "Repository type:" not in attributes:
+            mmcrcluster = mmcrcluster + "--ccr-disable "
+            if cluster_primary is not None:
+                mmcrcluster = mmcrcluster + "-p {0} ".format(cluster_primary)
+            if cluster_secondary:
                 mmcrcluster = mmcrcluster + "-s {0} ".format(cluster_secondary)
         
-        if cluster_rsh != self.getDefaultMMCRCLUSTEROption("-r"):
+        if cluster_rsh is not None and cluster_rsh != self.getDefaultMMCRCLUSTEROption("-r"):
             mmcrcluster = mmcrcluster + "-r {0} ".format(cluster_rsh)
         
-        if cluster_rcp != self.getDefaultMMCRCLUSTEROption("-R"):
+        if cluster_rcp is not None and cluster_rcp != self.getDefaultMMCRCLUSTEROption("-R"):
             mmcrcluster = mmcrcluster + "-R {0} ".format(cluster_rcp)
-            
-        mmcrcluster = mmcrcluster + "-C {0} ".format(cluster_name)
         
-        if "cluster_autostart" in locals():
+        if cluster_name is not None:
+            mmcrcluster = mmcrcluster + "-C {0} ".format(cluster_name)
+        
+        if [option for section, option in self.getConfig(index)["options"] if option[0] == "autoload"]:
             mmcrcluster = mmcrcluster + "-A "
         
         mmcrcluster = mmcrcluster + "-c configFile "
@@ -353,15 +441,62 @@ class parse_gsctl():
             return False
         
     def getDefaultMMLSFSOption(self, option):  
-        for opt in self.MMLSFS:
-            if opt[0] == option:
-                if opt[1] == None:
-                    return None
-                return opt[1]
+        return self.MMLSFS_DEFAULTS.get(option)
 
     def getDefaultMMCRCLUSTEROption(self, option):  
-        for opt in self.MMCRCLUSTER:
-            if opt[0] == option:
-                if opt[1] == None:
-                    return None
-                return opt[1]
\ No newline at end of file
+        return self.MMCRCLUSTER_DEFAULTS.get(option)
+
+class lazy_gsctl():
+    """Parses the gsctl archives the first time the data is used
+    
+       Behaves like parse_gsctl. The data of each archive is taken from the 
+       cache, if available, so only the changed archives are parsed.
+    """
+    
+    def __init__(self, gsctl, cache = None):
+        self.__gsctl = [gsctl] if isinstance(gsctl, str) else gsctl
+        self.__cache = cache
+        self.__parsed = None
+    
+    def __load(self):
+        if self.__parsed is None:
+            data = {}
+            missing = []
+            
+            for index, filename in enumerate(self.__gsctl):
+                cached = self.__cache.get(filename, "gsctl") if self.__cache and not os.path.isdir(filename) else None
+                
+                if cached:
+                    print("- {0} (cached)".format(filename))
+                    data[index] = cached
+                else:
+                    missing.append((index, filename))
+            
+            if missing:
+                parsed = parse_gsctl([filename for _, filename in missing]).getData()
+                
+                for (index, filename), clusterData in zip(missing, parsed.values()):
+                    data[index] = clusterData
+                    
+                    if self.__cache and not os.path.isdir(filename):
+                        self.__cache.put(filename, "gsctl", clusterData)
+            
+            # The cached clusters were added first, the data is ordered by index again
+            self.__parsed = parse_gsctl(self.__gsctl, OrderedDict(sorted(data.items())))
+        
+        return self.__parsed
+    
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        
+        return getattr(self.__load(), name)
+    
+    def __getitem__(self, index):
+        return self.__load().getData()[index]
+    
+    def __iter__(self):
+        return iter(self.__load().getData())
+    
+    def __len__(self):
+        return len(self.__load().getData())
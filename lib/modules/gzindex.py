@@ -0,0 +1,383 @@
+'''
+Created on 18 Oct 2026
+
+@author: mwolf
+
+This module is for random access into gzip compressed tar archives.
+While a .tar.gz is scanned the first time, the state of the decompressor
+(bit position and the last 32K of output) is recorded every SPAN bytes of
+output, together with the offset of each member in the tar stream. The
+index is stored as a sidecar file next to the archive ("<archive>.dsidx"),
+so later scans only decompress the members they read, starting from the
+nearest checkpoint (see zran.c in the zlib examples).
+
+The python zlib module doesn't expose the bit position of inflate, so the
+system libz is used via ctypes. If it can't be loaded, available() is False
+and the archives are read sequentially as before.
+
+'''
+
+import os
+import io
+import json
+import bisect
+import zlib
+import struct
+import tarfile
+import ctypes
+import ctypes.util
+
+from collections import OrderedDict
+
+#Distance between the checkpoints in the uncompressed stream
+SPAN = 4*1024*1024
+
+#Size of the deflate window and of the compressed input chunks
+WINSIZE = 32768
+CHUNK = 65536
+
+SUFFIX = ".dsidx"
+MAGIC = b"DSIDX1\n"
+
+Z_OK = 0
+Z_STREAM_END = 1
+Z_NEED_DICT = 2
+Z_BLOCK = 5
+
+class _ZStream(ctypes.Structure):
+    _fields_ = [("next_in", ctypes.c_void_p),
+                ("avail_in", ctypes.c_uint),
+                ("total_in", ctypes.c_ulong),
+                ("next_out", ctypes.c_void_p),
+                ("avail_out", ctypes.c_uint),
+                ("total_out", ctypes.c_ulong),
+                ("msg", ctypes.c_char_p),
+                ("state", ctypes.c_void_p),
+                ("zalloc", ctypes.c_void_p),
+                ("zfree", ctypes.c_void_p),
+                ("opaque", ctypes.c_void_p),
+                ("data_type", ctypes.c_int),
+                ("adler", ctypes.c_ulong),
+                ("reserved", ctypes.c_ulong)]
+
+def _loadZlib():
+    try:
+        libz = ctypes.CDLL(ctypes.util.find_library("z") or "libz.so.1")
+    except OSError:
+        return None
+
+    stream = ctypes.POINTER(_ZStream)
+    libz.zlibVersion.restype = ctypes.c_char_p
+    libz.inflateInit2_.argtypes = [stream, ctypes.c_int, ctypes.c_char_p, ctypes.c_int]
+    libz.inflate.argtypes = [stream, ctypes.c_int]
+    libz.inflateEnd.argtypes = [stream]
+    libz.inflateReset.argtypes = [stream]
+    libz.inflateReset2.argtypes = [stream, ctypes.c_int]
+    libz.inflatePrime.argtypes = [stream, ctypes.c_int, ctypes.c_int]
+    libz.inflateSetDictionary.argtypes = [stream, ctypes.c_char_p, ctypes.c_uint]
+
+    return libz
+
+_libz = _loadZlib()
+
+def available():
+    return _libz is not None
+
+def sidecar(path):
+    return path + SUFFIX
+
+class _Inflater():
+    """A z_stream reading compressed input from a file"""
+
+    def __init__(self, file, windowBits):
+        self.file = file
+        self.strm = _ZStream()
+        self.input = ctypes.create_string_buffer(CHUNK)
+        self.eof = False
+
+        ret = _libz.inflateInit2_(ctypes.byref(self.strm), windowBits, _libz.zlibVersion(), ctypes.sizeof(_ZStream))
+        if ret != Z_OK:
+            raise zlib.error("inflateInit2 failed ({})".format(ret))
+
+    def fill(self):
+        """Reads the next chunk of compressed input, if the current one is used up"""
+        if self.strm.avail_in == 0:
+            n = self.file.readinto(memoryview(self.input).cast("B"))
+            self.strm.next_in = ctypes.addressof(self.input)
+            self.strm.avail_in = n
+            self.eof = n == 0
+
+    def inflate(self, out, offset, size, flush = 0):
+        """Inflates at most size bytes into out[offset:], returns (return code, bytes produced)"""
+        self.fill()
+
+        if self.eof and self.strm.avail_in == 0:
+            raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+
+        self.strm.next_out = ctypes.addressof(out) + offset
+        self.strm.avail_out = size
+
+        ret = _libz.inflate(ctypes.byref(self.strm), flush)
+
+        if ret == Z_NEED_DICT or ret < 0:
+            raise zlib.error("Error {} while decompressing: {}".format(ret, self.strm.msg))
+
+        return ret, size - self.strm.avail_out
+
+    def hasMember(self):
+        """True if another gzip member follows the end of the current one"""
+        self.fill()
+        return self.strm.avail_in > 0 and ctypes.string_at(self.strm.next_in, 1) == b"\x1f"
+
+    def close(self):
+        _libz.inflateEnd(ctypes.byref(self.strm))
+
+class GzipIndexBuilder(io.RawIOBase):
+    """Decompresses a gzip file and records the checkpoints on the way
+
+       Used as the file object of a tarfile in stream mode. If the whole
+       stream is read, save() writes the index with the given members.
+    """
+
+    def __init__(self, path, span = SPAN):
+        self.__path = path
+        self.__span = span
+        self.__file = open(path, "rb")
+        self.__inflater = _Inflater(self.__file, 47)  # gzip or zlib header
+        self.__window = ctypes.create_string_buffer(WINSIZE)
+        self.__pos = 0
+        self.__totin = 0
+        self.__totout = 0
+        self.__last = 0
+        self.__points = []
+        self.__done = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        strm = self.__inflater.strm
+
+        while not self.__done:
+            start = self.__pos
+            ret, produced = self.__inflater.inflate(self.__window, start, min(len(b), WINSIZE - start), Z_BLOCK)
+
+            # The input is read in chunks, so the consumed input is the file position minus the unused input
+            self.__totin = self.__file.tell() - strm.avail_in
+            self.__totout += produced
+            self.__pos = (start + produced) % WINSIZE
+
+            if ret == Z_STREAM_END:
+                # Concatenated gzip members are read as one stream
+                if self.__inflater.hasMember():
+                    _libz.inflateReset(ctypes.byref(strm))
+                else:
+                    self.__done = True
+            elif strm.data_type & 128 and not strm.data_type & 64 and \
+                 (self.__totout == 0 or self.__totout - self.__last > self.__span):
+                self.__addPoint(strm.data_type & 7)
+
+            if produced:
+                # Only the produced bytes are copied, not the whole window
+                b[:produced] = ctypes.string_at(ctypes.addressof(self.__window) + start, produced)
+                return produced
+
+        return 0
+
+    def __addPoint(self, bits):
+        window = self.__window.raw
+        window = window[self.__pos:] + window[:self.__pos]
+        self.__points.append((self.__totout, self.__totin, bits, window[WINSIZE - min(self.__totout, WINSIZE):]))
+        self.__last = self.__totout
+
+    def save(self, members):
+        """Stores the index and the regular files of the archive next to it"""
+        stat = os.stat(self.__path)
+        header = {"size": stat.st_size,
+                  "mtime": stat.st_mtime_ns,
+                  "span": self.__span,
+                  "points": [],
+                  "members": OrderedDict((m.name, [m.offset_data, m.size]) for m in members if m.isfile())}
+        windows = []
+
+        for out, inp, bits, window in self.__points:
+            windows.append(zlib.compress(window))
+            header["points"].append([out, inp, bits, len(windows[-1])])
+
+        header = json.dumps(header).encode()
+
+        try:
+            with open(sidecar(self.__path) + ".tmp", "wb") as f:
+                f.write(MAGIC)
+                f.write(struct.pack("<Q", len(header)))
+                f.write(header)
+                for window in windows:
+                    f.write(window)
+
+            os.replace(sidecar(self.__path) + ".tmp", sidecar(self.__path))
+        except OSError as e:
+            print("      NOTE: Can't write the index for {}: {}".format(self.__path, e))
+
+    def close(self):
+        if not self.closed:
+            self.__inflater.close()
+            self.__file.close()
+
+        super().close()
+
+class GzipIndex():
+    """Checkpoints and members of a gzip compressed tar archive"""
+
+    def __init__(self, path, header, windows):
+        self.path = path
+        self.span = header["span"]
+        self.points = header["points"]
+        self.members = header["members"]
+        self.__windows = windows
+        self.__offsets = [0]
+
+        for point in self.points:
+            self.__offsets.append(self.__offsets[-1] + point[3])
+
+    @classmethod
+    def load(cls, path):
+        """Loads the sidecar of the archive or returns None if there is no valid one"""
+        try:
+            with open(sidecar(path), "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    return None
+
+                size = struct.unpack("<Q", f.read(8))[0]
+                header = json.loads(f.read(size).decode())
+                windows = f.read()
+        except (OSError, ValueError, struct.error):
+            return None
+
+        stat = os.stat(path)
+        if header.get("size") != stat.st_size or header.get("mtime") != stat.st_mtime_ns:
+            return None
+
+        return cls(path, header, windows)
+
+    def window(self, point):
+        """The 32K of output before the checkpoint"""
+        return zlib.decompress(self.__windows[self.__offsets[point]:self.__offsets[point + 1]])
+
+class GzipReader():
+    """Reads the uncompressed stream at any offset using the checkpoints
+
+       Reads at increasing offsets continue from the current position as
+       long as the gap is smaller than the span of the index.
+    """
+
+    def __init__(self, index):
+        self.__index = index
+        self.__file = open(index.path, "rb")
+        self.__inflater = None
+        self.__buffer = ctypes.create_string_buffer(CHUNK)
+        self.__offsets = [p[0] for p in index.points]
+        self.__pos = None
+
+    def __start(self, offset):
+        """Restarts the decompression at the last checkpoint before offset"""
+        point = max(0, bisect.bisect_right(self.__offsets, offset) - 1)
+        out, inp, bits, _ = self.__index.points[point]
+
+        if self.__inflater:
+            self.__inflater.close()
+
+        self.__file.seek(inp - (1 if bits else 0))
+        self.__inflater = _Inflater(self.__file, -15)  # raw deflate
+
+        if bits:
+            _libz.inflatePrime(ctypes.byref(self.__inflater.strm), bits, self.__file.read(1)[0] >> (8 - bits))
+
+        window = self.__index.window(point)
+        if window:
+            _libz.inflateSetDictionary(ctypes.byref(self.__inflater.strm), window, len(window))
+
+        self.__pos = out
+
+    def __inflate(self, size):
+        """Returns up to size bytes of output at the current position"""
+        ret, produced = self.__inflater.inflate(self.__buffer, 0, min(size, CHUNK))
+
+        if ret == Z_STREAM_END:
+            # Skip the trailer of the gzip member and continue with the next one
+            strm = self.__inflater.strm
+            self.__file.seek(self.__file.tell() - strm.avail_in + 8)
+            strm.avail_in = 0
+            _libz.inflateReset2(ctypes.byref(strm), 47)
+
+        self.__pos += produced
+        return ctypes.string_at(self.__buffer, produced)
+
+    def read(self, offset, size):
+        """Reads size bytes at offset of the uncompressed stream"""
+        if self.__pos is None or offset < self.__pos or offset - self.__pos > self.__index.span:
+            self.__start(offset)
+
+        while self.__pos < offset:
+            self.__inflate(offset - self.__pos)
+
+        data = []
+        while size > 0:
+            chunk = self.__inflate(size)
+            data.append(chunk)
+            size -= len(chunk)
+
+        return b"".join(data)
+
+    def close(self):
+        if self.__inflater:
+            self.__inflater.close()
+
+        self.__file.close()
+
+class _MemberFile(io.RawIOBase):
+    """File object of a member read through the index"""
+
+    def __init__(self, reader, offset, size):
+        self.__reader = reader
+        self.__offset = offset
+        self.__size = size
+        self.__pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), self.__size - self.__pos)
+        if n <= 0:
+            return 0
+
+        data = self.__reader.read(self.__offset + self.__pos, n)
+        b[:len(data)] = data
+        self.__pos += len(data)
+        return len(data)
+
+class IndexedTar():
+    """Iterates the regular files of an indexed archive like a tarfile
+
+       Only the members passed to extractfile() are decompressed.
+    """
+
+    def __init__(self, index):
+        self.__index = index
+        self.__reader = GzipReader(index)
+
+    def __iter__(self):
+        for name, (offset, size) in self.__index.members.items():
+            member = tarfile.TarInfo(name)
+            member.size = size
+            member.offset_data = offset
+            yield member
+
+    def __len__(self):
+        return len(self.__index.members)
+
+    def extractfile(self, member):
+        return io.BufferedReader(_MemberFile(self.__reader, member.offset_data, member.size), CHUNK)
+
+    def close(self):
+        self.__reader.close()
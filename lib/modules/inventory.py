@@ -0,0 +1,245 @@
+'''
+Created on 18 Oct 2026
+
+@author: mwolf
+
+This module is for the inventory of an SFA subsystem (pools, virtual disks,
+physical disks, enclosures) parsed from the sections of show sub sum.
+The tables are stored column oriented. Numeric columns are arrays, so
+counts and totals are sums over a column instead of regex scans.
+
+'''
+
+import re
+
+from array import array
+from collections import OrderedDict
+
+#Size units of show sub sum in bytes
+UNITS = {"B": 1,
+         "KB": 1000, "MB": 1000**2, "GB": 1000**3, "TB": 1000**4, "PB": 1000**5,
+         "KiB": 1024, "MiB": 1024**2, "GiB": 1024**3, "TiB": 1024**4, "PiB": 1024**5}
+
+#Columns with names, serials or times, which differ between otherwise identical subsystems
+NAMING = re.compile(r"name|serial|uid|wwn|wwid|label|time|date", re.IGNORECASE)
+
+#Dates and times in a section, e.g. 2023-05-09, 05/09/2023 or 12:30:01
+TIMESTAMP = re.compile(r"\b\d{1,4}[-/]\d{1,2}[-/]\d{1,4}\b|\b\d{1,2}:\d{2}(?::\d{2})?\b")
+
+def normalizeSection(text, names = ()):
+    """The rows of a section without the naming, serial and time columns and without timestamps
+
+       Each table of the section starts with a header line. The tokens of a row
+       belong to the column whose header starts before them, so columns like
+       "Name" or "Serial" are removed by their position. The given names (e.g. the
+       subsystem name) are removed everywhere.
+       Raises ValueError if a table of the section can't be split into columns.
+    """
+    if not text:
+        return ()
+
+    rows = []
+    columns = None
+
+    for line in text.split("\n"):
+        if not line.strip():
+            columns = None
+            rows.append(())
+            continue
+
+        for name in names:
+            if name:
+                line = line.replace(name, "")
+
+        line = TIMESTAMP.sub("", line)
+
+        if columns is None:
+            columns = [(m.start(), m.group()) for m in re.finditer(r"\S+", line)]
+
+            if len(columns) < 2:
+                raise ValueError("Can't split the section into columns: {}".format(line.strip()))
+
+            rows.append(tuple(name for _, name in columns if not NAMING.search(name)))
+            continue
+
+        row = []
+
+        for token in re.finditer(r"\S+", line):
+            column = [name for start, name in columns if start < token.end()]
+
+            if not column:
+                raise ValueError("Value outside of the columns: {}".format(line.strip()))
+
+            if not NAMING.search(column[-1]):
+                row.append(token.group())
+
+        rows.append(tuple(row))
+
+    return tuple(rows)
+
+def toNumber(value):
+    """Converts a value to int or float or returns None"""
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+class Table():
+    """Column oriented table of a section
+
+       The first line is the header, the columns are separated by whitespace.
+       The rows end at the first empty line. The last column takes the rest of
+       a row. Columns with only numbers are stored as array.
+    """
+
+    def __init__(self, text, skip = ("Found:",)):
+        self.header = []
+        self.columns = OrderedDict()
+        self.__rows = 0
+
+        if not text:
+            return
+
+        lines = iter(line for line in text.split("\n") if not line.strip().startswith(skip))
+
+        for line in lines:
+            if line.strip():
+                self.header = line.split()
+                break
+
+        values = [[] for _ in self.header]
+
+        for line in lines:
+            if not line.strip():
+                break
+
+            row = line.split(None, len(self.header) - 1)
+            row += [""] * (len(self.header) - len(row))
+
+            for column, value in enumerate(row):
+                values[column].append(value.strip())
+
+            self.__rows += 1
+
+        for name, column in zip(self.header, values):
+            numbers = [toNumber(v) for v in column]
+
+            if None in numbers:
+                self.columns[name] = column
+            elif all(isinstance(n, int) for n in numbers):
+                self.columns[name] = array("q", numbers)
+            else:
+                self.columns[name] = array("d", numbers)
+
+    def __len__(self):
+        return self.__rows
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def column(self, name):
+        return self.columns[name]
+
+    def rows(self):
+        return list(zip(*self.columns.values()))
+
+    def sum(self, name):
+        return sum(self.columns[name])
+
+    def count(self, name, value):
+        """Number of rows with value in the column"""
+        return sum(1 for v in self.columns[name] if v == value)
+
+    def signature(self):
+        """The columns except the naming, to compare the configuration of two tables"""
+        return tuple((name, tuple(column)) for name, column in self.columns.items() if not NAMING.search(name))
+
+    def groupBy(self, name):
+        """Number of rows per value of the column"""
+        groups = OrderedDict()
+
+        for value in self.columns[name]:
+            groups[value] = groups.get(value, 0) + 1
+
+        return groups
+
+class DiskSummary():
+    """The 'Found:' lines of the physical disks, one row per disk type"""
+
+    FOUND = re.compile(r"(Found:)( *\d+)( \w+)( +\S+)( +\S+)( +\S+)( \w+)( +\S+)( +\S+)( +\S+)")
+
+    def __init__(self, text):
+        self.count = array("q")
+        self.bytes = array("d")
+        self.manufacturer = []
+        self.model = []
+        self.type = []
+        self.size = []
+        self.firmware = []
+
+        for found in self.FOUND.finditer(text or ""):
+            size = toNumber(found.group(6).strip()) or 0
+
+            self.count.append(int(found.group(2)))
+            self.bytes.append(size * UNITS.get(found.group(7).strip(), 0))
+            self.manufacturer.append(found.group(3).strip())
+            self.model.append(found.group(4).strip())
+            self.type.append(found.group(5).strip())
+            self.size.append(found.group(6).strip() + found.group(7))
+            self.firmware.append(found.group(9).strip())
+
+    def __len__(self):
+        return len(self.count)
+
+    def rows(self):
+        """Count, manufacturer, model, type, size and firmware per disk type"""
+        return list(zip(self.count, self.manufacturer, self.model, self.type, self.size, self.firmware))
+
+    def total(self):
+        """Number of disks"""
+        return sum(self.count)
+
+    def capacity(self):
+        """Raw capacity of all disks in bytes"""
+        return sum(c * b for c, b in zip(self.count, self.bytes))
+
+    def byModel(self):
+        """Number of disks per model"""
+        models = OrderedDict()
+
+        for count, model in zip(self.count, self.model):
+            models[model] = models.get(model, 0) + count
+
+        return models
+
+    def byType(self):
+        """Number of disks per type (e.g. SAS, SSD)"""
+        types = OrderedDict()
+
+        for count, diskType in zip(self.count, self.type):
+            types[diskType] = types.get(diskType, 0) + count
+
+        return types
+
+class Inventory():
+    """Inventory of an SFA subsystem"""
+
+    def __init__(self, sss):
+        self.pools = Table(sss.getRawSectionData("Pool(s)"))
+        self.spares = Table(sss.getRawSectionData("Spare Pool(s)"))
+        self.virtualDisks = Table(sss.getRawSectionData("Virtual Disk(s)"))
+        self.physicalDisks = Table(sss.getRawSectionData("Physical Disk(s)"))
+        self.enclosures = Table(sss.getRawSectionData("Enclosure(s)"))
+        self.disks = DiskSummary(sss.getRawSectionData("Physical Disk(s)"))
+
+    def signature(self):
+        """The configuration of the subsystem without the naming"""
+        return (self.pools.signature(),
+                self.spares.signature(),
+                self.virtualDisks.signature(),
+                self.physicalDisks.signature(),
+                self.enclosures.signature(),
+                tuple(self.disks.rows()))
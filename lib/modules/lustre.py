@@ -17,15 +17,66 @@ from ClusterShell.NodeSet import NodeSet
 
 from os.path import isfile
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import json
 
-from config import ConfigDict
 from modules.exascaler import es_config_loader
+from modules.tools import spool, openSpool
+from modules.store import ContentStore
+from modules.archive import openTar
 
 def sortNodes(s):
     subbed = re.sub('[\[\]]', '', s).lower()
     return any(c in '!@#$%^&*' for c in s), subbed
 
+def compileFOI(fois, excludedNodes = None):
+    """Compiles the files of interest and the excluded nodes into one alternation regex each
+    
+       Returns
+       -------
+       tuple 
+            [0] the regex for the files of interest and [1] the regex for the excluded nodes or None
+    """
+    def alternation(names):
+        return re.compile("|".join(re.escape(n) for n in sorted(set(names), key=len, reverse=True)))
+    
+    return alternation(fois), alternation(excludedNodes) if excludedNodes else None
+
+def findFOI(name, matcher):
+    foiRegEx, excludedRegEx = matcher
+    
+    if not foiRegEx.search(name):
+        return False
+    
+    return not (excludedRegEx and excludedRegEx.search(name))
+
+def scanSOS(spooled, matcher):
+    """Scans a spooled node archive of a sos report
+    
+       Runs in a worker process. The whole archive is read, as several members can 
+       match the same file of interest and the last one wins.
+       Returns the raw content of the files, decoding is left to the ContentStore.
+    """
+    data = {}
+    
+    with openSpool(spooled) as node_sos, tarfile.open(fileobj=node_sos, mode="r:*") as gz:
+        for member in gz:
+            if not member.isfile() or not findFOI(member.name, matcher):
+                continue
+            
+            content = gz.extractfile(member).read()
+            foi = os.path.basename(member.name)
+            
+            if foi == "exascaler.toml":
+                foi = "exascaler.conf.raw"
+                
+            if "sh_-c_rpm_--nodigest_-qa" in foi:
+                foi = "rpm_qa.txt"
+        
+            data[foi] = content
+    
+    return data
+
 class parse_esctl():     
     #Files of interest
     __FOI = ["sysconfig_network.network", "lustre_log.txt", "etc.modprobe.d.lustre.conf", 
@@ -40,92 +91,48 @@ class parse_esctl():
     
     __excludedNodes = []
     
-    def __init__(self, es_showall, combine = None, ignore = True):
+    #Nested node archives of a sos report
+    __SOSArchives = (".tar", ".tar.gz", ".tgz", ".tar.xz", ".txz", ".tar.bz2")
+    
+    def __init__(self, es_showall, combine = None, ignore = True, cache = None, spoolThreshold = None):
         try:
-            if isfile(es_showall):
-                __esctl_data = ConfigDict()
+            if isfile(es_showall) or os.path.isdir(es_showall):
                 self.__combine = combine
-                
-                if os.path.getsize(es_showall) > 500000000:
-                    print("      NOTE: The filesize is > 500MB. Be patient!\n            A list of all files in the TAR will be generated now")
+                self.__spoolThreshold = spoolThreshold
                 
                 if self.__combine:
                     nodes = re.findall(r"(.+?)(?:,|$)(?!\d)", self.__combine, re.MULTILINE)
                     self.__excludedNodes = [n for nodeSet in nodes for n in NodeSet(nodeSet)[1:]]
+                    
+                    # host -> combined node set, the first node set containing the host wins
+                    self.__hostMap = {}
+                    for nodeSet in nodes:
+                        for n in NodeSet(nodeSet):
+                            self.__hostMap.setdefault(n, nodeSet)
                 
-                with tarfile.open(es_showall, "r:*") as self.tar:
+                self.__matcher = compileFOI(self.__FOI, self.__excludedNodes)
+                self.__matcher62 = compileFOI(self.__FOI62, self.__excludedNodes)
+                
+                index = None
+                kind = "esctl:{}".format(self.__combine or "")
+                
+                # An extracted showall is read directly, there is nothing to decompress
+                if os.path.isdir(es_showall):
+                    cache = None
+                
+                if cache:
+                    index = cache.get(es_showall, kind)
                     
-                    #Check if showall or sos
-                    sos = None
-
-                    try:
-                        sos = self.tar.extractfile(Path(Path(es_showall).stem).stem + "/sos_reports/manifest.json")
-                    except Exception as e:
-                        pass
+                if index and os.path.isfile(cache.blob(es_showall, kind)):
+                    print("      Using cached data of {}".format(os.path.basename(es_showall)))
+                    self.__esctl_data = ContentStore(cache.blob(es_showall, kind), index)
+                else:
+                    self.__esctl_data = self.__scan(es_showall)
                     
-                    if sos:
-                        manifest = json.loads(sos.read())
-                        
-                        for node in manifest["components"]["collect"]["nodes"]:
-                            print("\n      {}:".format(manifest["components"]["collect"]["nodes"][node]["hostname"]))
-                            print("            Extracting {} to scan the files".format(manifest["components"]["collect"]["nodes"][node]["collected_archive"]))
-                            node_sos = self.tar.extractfile(Path(Path(es_showall).stem).stem + "/" + manifest["components"]["collect"]["nodes"][node]["collected_archive"])
-                            
-                            hostname = manifest["components"]["collect"]["nodes"][node]["hostname"]
-                            if hostname not in __esctl_data:
-                                __esctl_data[hostname] = {}
-                                  
-                            with tarfile.open(fileobj=node_sos, mode="r:*") as gz:
-                                m = filter(self.__findFOI62, tqdm(gz.getmembers(), smoothing=0.5, desc="            Scanning files", unit=" files", ncols=110, delay=1)) #colour="#A71930"))    
-                                for member in m:
-                                    f = gz.extractfile(member)
-                                    
-                                    if f:
-                                        content = f.read().decode("utf-8", "replace")
-                                        foi = os.path.basename(member.name)
-                                
-                                    if foi == "exascaler.toml":
-                                        foi = "exascaler.conf.raw"
-                                        
-                                    if "sh_-c_rpm_--nodigest_-qa" in foi:
-                                        foi = "rpm_qa.txt"
-                                
-                                    __esctl_data[hostname][foi] = content.strip()
-                    else:
-                        #get all members in the tar file that match the FOIs
-                        m = filter(self.__findFOI, tqdm(self.tar.getmembers(), smoothing=0.5, desc="      Scanning files", unit=" files", ncols=110, delay=3)) #colour="#A71930"))                 
-                        
-                        for member in m:
-                            host = member.name.split("/")[2]
-                            
-                            if self.__combine:
-                                nodes = re.findall(r"(.+?)(?:,|$)(?!\d)", self.__combine, re.MULTILINE)
-                                for nodeSet in nodes:
-                                    for n in NodeSet(nodeSet):
-                                        if n == host:
-                                            host = nodeSet
-                                            break                
-                            
-                            if host not in __esctl_data:
-                                __esctl_data[host] = {}
-                                                        
-                            f = self.tar.extractfile(member)
-                            
-                            if f:
-                                content = f.read().decode("utf-8", "replace")
-                                
-                                listData = re.search(r"(?s)(?<=STDOUT:\n).*?(?=STDERR:)", content, re.MULTILINE)
-                                foi = os.path.basename(member.name)
-                                
-                                if foi == "etc.ddn.exascaler.conf" or foi == "exascaler_conf.exascaler.conf":
-                                    foi = "exascaler.conf.raw"
-                                
-                                if listData:
-                                    __esctl_data[host][foi] = listData.group().strip()
-                                else:
-                                    __esctl_data[host][foi] = content.strip()
+                    if cache:
+                        cache.put(es_showall, kind, self.__esctl_data.getIndex(), self.__esctl_data.getBlob())
                     
-                self._exaconfig = es_config_loader(__esctl_data)  
+                self._exaconfig = es_config_loader(self.__esctl_data)  
                 self._exaconfig.getExaScalerVersionNum()
             else:
                 print("\n{} can't be found.\nExit".format(es_showall))
@@ -134,6 +141,100 @@ class parse_esctl():
         except Exception as e:
             print("Can't read 'exascaler.conf' because of an issue. Message received: {}\n".format(e))
             exit()
+    
+    def __scan(self, es_showall):
+        """Scans the showall and returns the content of all files of interest per node"""
+        __esctl_data = ContentStore()
+        
+        if isfile(es_showall) and os.path.getsize(es_showall) > 500000000:
+            print("      NOTE: The filesize is > 500MB. Be patient!\n            The TAR will be scanned in a single pass now")
+        
+        if os.path.isdir(es_showall):
+            root = os.path.basename(os.path.normpath(es_showall))
+        else:
+            root = Path(Path(es_showall).stem).stem
+        manifest = None
+        nested = {}
+        pool = None
+        spools = []
+        
+        # Single forward pass over the (compressed) stream. Members are read as they 
+        # pass by, so the archive is never indexed and never decompressed twice.
+        # The stream is decompressed by a multi-threaded decompressor if one is installed.
+        # An extracted showall (directory) is walked in the same layout.
+        # Nested node archives of a sos report are spooled out and scanned by a process pool.
+        try:
+            with openTar(es_showall) as self.tar:
+                for member in tqdm(self.tar, smoothing=0.5, desc="      Scanning files", unit=" files", ncols=110, delay=3): #colour="#A71930"))
+                    if not member.isfile():
+                        continue
+                
+                    #Check if showall or sos
+                    if member.name == root + "/sos_reports/manifest.json":
+                        manifest = json.loads(self.tar.extractfile(member).read())
+                    
+                        if self.__sosComplete(manifest, nested):
+                            break
+                        continue
+                
+                    if self.__isSOSArchive(member, root, manifest):
+                        archive = member.name[len(root) + 1:]
+                        print("\n            Extracting {} to scan the files".format(archive))
+                    
+                        if not pool:
+                            pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+                    
+                        spools.append(spool(self.tar.extractfile(member), self.__spoolThreshold))
+                        nested[archive] = pool.submit(scanSOS, spools[-1], self.__matcher62)
+                    
+                        if self.__sosComplete(manifest, nested):
+                            break
+                        continue
+                
+                    if manifest or not self.__findFOI(member):
+                        continue
+                
+                    host = member.name.split("/")[2]
+                
+                    if self.__combine:
+                        host = self.__hostMap.get(host, host)
+                
+                    foi = os.path.basename(member.name)
+                
+                    if foi == "etc.ddn.exascaler.conf" or foi == "exascaler_conf.exascaler.conf":
+                        foi = "exascaler.conf.raw"
+                
+                    __esctl_data.add(host, foi, self.tar.extractfile(member), envelope=True)
+        
+            if pool:
+                print("\n      Waiting for {} node archives".format(len(nested)))
+        
+            if manifest:
+                # The archives of a sos report replace anything found in the showall layout.
+                # The results are merged in the order of the manifest.
+                __esctl_data.close()
+                __esctl_data = ContentStore()
+            
+                for node in manifest["components"]["collect"]["nodes"]:
+                    hostname = manifest["components"]["collect"]["nodes"][node]["hostname"]
+                    archive = manifest["components"]["collect"]["nodes"][node]["collected_archive"]
+                    print("      {}: {}".format(hostname, archive))
+                
+                    __esctl_data.addHost(hostname)
+                
+                    if archive in nested:
+                        for foi, content in nested[archive].result().items():
+                            __esctl_data.add(hostname, foi, content)
+        finally:
+            if pool:
+                # Workers that didn't start yet are cancelled and their spools removed
+                pool.shutdown(cancel_futures=True)
+                
+                for spooled in spools:
+                    if isinstance(spooled, str) and os.path.exists(spooled):
+                        os.unlink(spooled)
+        
+        return __esctl_data
                 
     def getData(self):
         """Get the discovered listData from the esctl"""
@@ -162,6 +263,12 @@ class parse_esctl():
     def getLustreVersion(self):
         return self._exaconfig.getLustreVersion()
         
+    def getPackages(self, node):
+        return self._exaconfig.getPackages(node)
+    
+    def getPackageMatrix(self, packages = None):
+        return self._exaconfig.getPackageMatrix(packages)
+    
     def getLustreSettings(self):
         return self._exaconfig.getLustreSettings()
     
@@ -171,6 +278,10 @@ class parse_esctl():
     def getModuleSetting(self, node):
         return self._exaconfig.getModuleSetting(node)
     
+    def getConfigDrift(self, fois = None):
+        """The files that differ between the nodes, one row per group of nodes (see drift.ConfigDrift.getTable)"""
+        return self._exaconfig.getDrift().getTable(fois)
+    
     def getTimezone(self):
         return self._exaconfig.getTimezone()
     
@@ -291,29 +402,28 @@ class parse_esctl():
         
 
     def __findFOI(self, foi):
-        if [i for i, x in enumerate(self.__FOI) if x in foi.name]:
-            if len(self.__excludedNodes) == 0:
-                return True
-            else:
-                if [i for i, n in enumerate(self.__excludedNodes) if n in foi.name]:
-                    return False
-                else:
-                    return True
-        else:
-            return False  
+        return findFOI(foi.name, self.__matcher)
         
-    def __findFOI62(self, foi):
-        if [i for i, x in enumerate(self.__FOI62) if x in foi.name]:
-            if len(self.__excludedNodes) == 0:
-                return True
-            else:
-                if [i for i, n in enumerate(self.__excludedNodes) if n in foi.name]:
-                    return False
-                else:
-                    return True
+    def __isSOSArchive(self, member, root, manifest):
+        """Checks if the member is one of the collected node archives of a sos report
+        
+           As long as the manifest wasn't streamed yet, every tar next to the manifest in
+           sos_reports/ is a candidate. Tars anywhere else in a showall aren't scanned.
+        """
+        archive = member.name[len(root) + 1:]
+        
+        if manifest:
+            return archive in [n["collected_archive"] for n in manifest["components"]["collect"]["nodes"].values()]
         else:
-            return False  
+            return member.name.startswith(root + "/sos_reports/") and archive.endswith(self.__SOSArchives)
+    
+    def __sosComplete(self, manifest, nested):
+        """All node archives listed in the manifest are scanned"""
+        if not manifest:
+            return False
         
+        return all(n["collected_archive"] in nested for n in manifest["components"]["collect"]["nodes"].values())
+    
     # def __findInterface(self, foi):
     #     if [i for i, x in enumerate(self.getInterfaceList()) if x in foi.name]:
     #         return True
@@ -26,7 +26,7 @@ from modules.lustreConfig.filesystem_section import FilesystemSection
 from modules.lustreConfig.pool_section import PoolSection
 from modules.lustreConfig.zpool_section import ZpoolSection
 from modules.lustreConfig.host_section import HostSection
-from modules.lustreConfig.extra_section import ExtraSection
+from modules.lustreConfig.extra_section import ExtraSection, RawConfigView
 from modules.lustreConfig.sfa_section import SFASection
 from modules.lustreConfig.rest_section import RestSection
 #from es.utils import get_file_content
@@ -63,6 +63,10 @@ class EXAScalerConfig(object):
             configparser.ConfigParser.read(self, filenames)
             self._tune_aliased_nic_names()
 
+        def read_string(self, string, source='<string>'):
+            configparser.ConfigParser.read_string(self, string, source)
+            self._tune_aliased_nic_names()
+
         def optionxform(self, optionstr):
             """ Custom optionxform implementation which doesn't cast optionstr to lowercase.
             """
@@ -87,10 +91,10 @@ class EXAScalerConfig(object):
 
         if self.config.has_section('set_param_tunings'):
             self.global_settings.set_param_tunings = ExtraSection(
-                self.config_file, 'set_param_tunings', shadow_config=self.shadow_config)
+                self.raw_config, 'set_param_tunings', shadow_config=self.shadow_config)
         if self.config.has_section('conf_param_tunings'):
             self.global_settings.conf_param_tunings = ExtraSection(
-                self.config_file, 'conf_param_tunings', shadow_config=self.shadow_config)
+                self.raw_config, 'conf_param_tunings', shadow_config=self.shadow_config)
 
     def _tune_ha(self):
         """ Tune HA settings.
@@ -205,7 +209,7 @@ class EXAScalerConfig(object):
             self.hosts_settings[host] = HostSection(
                 self.config, host, self.host_defaults_settings, shadow_config=self.shadow_config)
 
-        sysctl_defaults = ExtraSection(self.config_file, 'sysctl_defaults', shadow_config=self.shadow_config)\
+        sysctl_defaults = ExtraSection(self.raw_config, 'sysctl_defaults', shadow_config=self.shadow_config)\
             if self.config.has_section('sysctl_defaults') else None
 
         for host in self.global_settings.host_list:
@@ -213,7 +217,7 @@ class EXAScalerConfig(object):
             if self.config.has_section('sysctl {0}'.format(host)):
                 self.hosts_settings[host].sysctl = \
                     ExtraSection(
-                        self.config_file,
+                        self.raw_config,
                         'sysctl {0}'.format(host),
                         sysctl_defaults.settings if sysctl_defaults is not None else None,
                         shadow_config=self.shadow_config)
@@ -271,9 +275,10 @@ class EXAScalerConfig(object):
             if self.hosts_settings[host].rest_keepalived_nic is None:
                 self.hosts_settings[host].rest_keepalived_nic = self.hosts_settings[host].rest_primary_nic
 
-    def __init__(self, config_file):
+    def __init__(self, config_file=None, config_string=None):
         """ Basic initialization.
         :param config_file: absolute path to configuration file.
+        :param config_string: content of the configuration file, used instead of config_file.
         """
 
         self.version = (None, None, None, )
@@ -283,7 +288,11 @@ class EXAScalerConfig(object):
 
         self.config_file = config_file
         self.config = self.EXAScalerConfigParser()
-        self.config.read(config_file)
+        if config_string is not None:
+            self.config.read_string(config_string)
+        else:
+            self.config.read(config_file)
+        self.raw_config = RawConfigView(self.config)
         self.shadow_config = None
 
         self._tune_global()
@@ -13,27 +13,58 @@
 """ Extra section of EXAScaler configuration file.
 """
 
-import configparser
 from collections import OrderedDict
 
 from modules.lustreConfig.section import EsConfigSection
 
 
+class RawConfigView(object):
+    """ Non-interpolating view of an already parsed configuration.
+    The values are returned as they are written in the configuration file,
+    so the file is parsed once and the view is shared by all extra sections.
+    """
+
+    def __init__(self, config):
+        """ Basic initialization.
+        :param config: parsed configuration (ConfigParser).
+        """
+
+        self._config = config
+
+    def has_section(self, section):
+        return self._config.has_section(section)
+
+    def has_option(self, section, option):
+        return self._config.has_option(section, option)
+
+    def options(self, section):
+        return self._config.options(section)
+
+    def get(self, section, option, **kwargs):
+        return self._config.get(section, option, raw=True, **kwargs)
+
+    def getint(self, section, option, **kwargs):
+        return self._config.getint(section, option, raw=True, **kwargs)
+
+    def getboolean(self, section, option, **kwargs):
+        return self._config.getboolean(section, option, raw=True, **kwargs)
+
+
 class ExtraSection(EsConfigSection):
     """ Extra section of EXAScaler configuration file.
     """
 
-    def __init__(self, config_file, section_name, default_settings=None, shadow_config=None):
+    def __init__(self, config, section_name, default_settings=None, shadow_config=None):
         """ Basic initialization.
+        :param config: parsed configuration, used without interpolation.
         """
 
         self._default_settings = default_settings
 
         self.settings = OrderedDict()
 
-        config = configparser.ConfigParser(interpolation=None)
-        config.optionxform = str
-        config.read(config_file)
+        if not isinstance(config, RawConfigView):
+            config = RawConfigView(config)
 
         super(ExtraSection, self).__init__(config, section_name, shadow_config)
 
@@ -0,0 +1,132 @@
+'''
+Created on 18 Oct 2026
+
+@author: mwolf
+
+This module is for the installed packages of a node (the output of rpm -qa).
+Each package list is parsed once into an index of name -> (version, release, arch),
+so the versions of the packages are dictionary lookups. The package versions
+of all nodes are compared in a matrix, where nodes with the same versions
+share one row.
+
+'''
+
+import re
+
+from collections import OrderedDict
+from modules.drift import fold
+
+ARCHS = {"x86_64", "noarch", "aarch64", "ppc64le", "i686", "i386", "src"}
+
+#Packages of interest, the first installed package of each group is used
+KEY_PACKAGES = OrderedDict([("Lustre", re.compile(r"^(kmod-)?lustre(-client)?$")),
+                            ("Kernel", re.compile(r"^kernel$")),
+                            ("OFED", re.compile(r"^(mlnx-ofed-(all|basic)|mlnx-ofa_kernel|ofed-scripts)$")),
+                            ("ExaScaler", re.compile(r"^(ddn-)?exa-?scaler$"))])
+
+def versionKey(version):
+    """Sort key of a version, numeric segments are newer than alphabetic ones like in rpmvercmp"""
+    return tuple((1, int(s), "") if s.isdigit() else (0, 0, s) for s in re.findall(r"\d+|[a-zA-Z]+", version))
+
+def parsePackage(line):
+    """Splits name-version-release.arch into (name, version, release, arch) or returns None"""
+    name, dot, arch = line.rpartition(".")
+
+    if not dot or arch not in ARCHS:
+        name, arch = line, ""
+
+    name, _, release = name.rpartition("-")
+    name, _, version = name.rpartition("-")
+
+    if not name or not version or not release:
+        return None
+
+    return name, version, release, arch
+
+class RpmInventory():
+    """The installed packages of a node
+
+       If a package is installed in several versions (e.g. kernel), the newest one is kept.
+    """
+
+    def __init__(self, text):
+        self.packages = OrderedDict()
+
+        for line in (text or "").split("\n"):
+            package = parsePackage(line.strip())
+
+            if package is None:
+                continue
+
+            name, version, release, arch = package
+
+            if name in self.packages and versionKey(version + "." + release) < versionKey("{0[0]}.{0[1]}".format(self.packages[name])):
+                continue
+
+            self.packages[name] = (version, release, arch)
+
+    def __contains__(self, name):
+        return name in self.packages
+
+    def __len__(self):
+        return len(self.packages)
+
+    def get(self, name):
+        """(version, release, arch) of the package or None"""
+        return self.packages.get(name)
+
+    def getVersion(self, name):
+        """version-release of the package or an empty string"""
+        package = self.packages.get(name)
+        return "{}-{}".format(package[0], package[1]) if package else ""
+
+    def find(self, pattern):
+        """The names of the installed packages that match the regex"""
+        return [name for name in self.packages if pattern.search(name)]
+
+    def getKeyPackage(self, key):
+        """The first installed package of a group of KEY_PACKAGES or None"""
+        names = self.find(KEY_PACKAGES[key])
+        return names[0] if names else None
+
+    def getLustre(self):
+        """The DDN Lustre package as name-version-release or None"""
+        for name in self.find(KEY_PACKAGES["Lustre"]):
+            version = self.getVersion(name)
+
+            if "ddn" in version and version[0].isdigit():
+                return "lustre-" + version
+
+        return None
+
+class RpmMatrix():
+    """Package versions per node, nodes with the same versions are folded into one row
+
+       The columns are package names or groups of KEY_PACKAGES.
+    """
+
+    def __init__(self, inventories, packages = None):
+        self.header = ["Nodes"] + list(packages if packages is not None else KEY_PACKAGES)
+        groups = OrderedDict()
+
+        for node, inventory in inventories.items():
+            row = tuple(self.__version(inventory, package) for package in self.header[1:])
+            groups.setdefault(row, []).append(node)
+
+        self.__rows = [[fold(nodes)] + list(row) for row, nodes in groups.items()]
+
+    def __version(self, inventory, package):
+        if package in KEY_PACKAGES:
+            package = inventory.getKeyPackage(package)
+
+        return inventory.getVersion(package) if package else ""
+
+    def __len__(self):
+        return len(self.__rows)
+
+    def rows(self):
+        return self.__rows
+
+    def isEqual(self):
+        """True if all nodes have the same versions"""
+        return len(self.__rows) < 2
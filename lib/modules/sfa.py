@@ -9,47 +9,32 @@ It currently excepts a tar or text file.
 '''
 
 import re
-from config import ConfigDict
+import bisect
+import hashlib
+
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from modules.inventory import Inventory, normalizeSection
+from modules.tools import memoize, ReportTable
+
+def parseSections(content):
+    """Return the section offsets of a 'show sub sum'. Used to parse in a process pool."""
+    return parse_sss(content).getSections()
 
 class parse_sss():
-    def __init__(self, content):
-        try:        
-            headerRegEx = r"(?:(?<=\* ).+(?= \*\n))"
-            dataRegEx = r"(?s)(?<=\*\n\n)[^*]+(?=\n\n\*)"
-            
-            unwanted = ["Jobs", "Event Log Information"]
-           
-            header = list()
-            listData = list()
-            
-            self.__sss_data = ConfigDict()
-            
+    
+    #Sections without useful data
+    UNWANTED = ["Jobs", "Event Log Information"]
+    
+    def __init__(self, content, sections = None):
+        try:
             content = content.replace("\r", "")
             
-            #Find all headers
-            headerMatch = list(re.finditer(headerRegEx, content, re.MULTILINE))
-            dataMatch = list(re.finditer(dataRegEx, content, re.MULTILINE))
-            for headerIndex, h in enumerate(headerMatch, start=0):
-                #Ommit the "Subsystem Summary" header as there is no listData
-                if "Subsystem Summary" in h.group().strip():
-                    continue
-                
-                #Find the listData for each header
-                for dataIndex, d in enumerate(dataMatch, start=1):
-                    if d.start() > h.end():
-                        if [uw for uw in unwanted if uw in h.group().strip()]:
-                            dataMatch.pop(dataIndex - 1)
-                            break
-                    
-                        if len(dataMatch) != dataIndex:
-                            #Match found for the header
-                            if d.end() < headerMatch[headerIndex + 1].start():
-                                header.append(h.group().strip())
-                                listData.append(d.group().rstrip())
-                                break
-
-            self.__sss_data = ConfigDict(zip(header,listData))
-            self.__sss_data["Content"] = content   
+            if not sections:
+                sections = self.__tokenize(content)
+            
+            self.__sss_data = Sections(content, sections)
             
             self.__subsystemName = self.getSubsystemName      
                     
@@ -57,16 +42,75 @@ class parse_sss():
             print(repr(e))
             exit()        
 
+    def __tokenize(self, content):
+        """Single pass over the section headers and the data blocks
+        
+           A data block starts after the box of a header ("*\n\n") and ends before the 
+           next box ("\n\n*"), so a block containing a "*" isn't a data block. Each 
+           header takes the first data block after it. The block of an unwanted section 
+           is dropped, the block of any other section is only used if it ends before the 
+           next header and isn't the last block of the content.
+        
+           Returns
+           -------
+           OrderedDict
+                section header -> [start, end] of the data in content
+        """
+        headers = list(re.finditer(r"(?<=\* ).+(?= \*\n)", content))
+        blocks = [[d.start(), d.end()] for d in re.finditer(r"(?s)(?<=\*\n\n)[^*]+(?=\n\n\*)", content)]
+        starts = [block[0] for block in blocks]
+        
+        dropped = set()
+        last = len(blocks) - 1
+        sections = OrderedDict()
+        
+        for index, h in enumerate(headers):
+            header = h.group().strip()
+            
+            if "Subsystem Summary" in header:
+                continue
+            
+            # The first block after the header, that wasn't dropped by an unwanted section
+            block = bisect.bisect_right(starts, h.end())
+            while block in dropped:
+                block += 1
+            
+            if block >= len(blocks):
+                continue
+            
+            if [uw for uw in self.UNWANTED if uw in header]:
+                dropped.add(block)
+                
+                while last in dropped:
+                    last -= 1
+                continue
+            
+            nextHeader = headers[index + 1].start() if index + 1 < len(headers) else len(content)
+            
+            if block != last and blocks[block][1] < nextHeader:
+                sections[header] = blocks[block]
+        
+        return sections
+
     def getData(self):
         """Return the SFA sss object"""
         return self
     
+    def getContent(self):
+        return self.__sss_data["Content"]
+    
+    def getSections(self):
+        """Return the offsets of all sections in the content"""
+        return self.__sss_data.getOffsets()
+    
+    @memoize
     def getRawSectionData(self, sectionHeader):
         if sectionHeader in self.__sss_data:
             return self.__sss_data[sectionHeader]
         else:
             return None
     
+    @memoize
     def getSubsytemModel(self):
         model = re.search("SFA.*", self.getRawSectionData("Subsystem"), re.MULTILINE)
         
@@ -75,6 +119,7 @@ class parse_sss():
         else:
             return None
         
+    @memoize
     def getSubsystemName(self):
         name = re.search("(?:\S+) +(?=\d)", self.getRawSectionData("Subsystem"), re.MULTILINE)
         
@@ -83,6 +128,7 @@ class parse_sss():
         else:
             return None
     
+    @memoize
     def getFirmware(self):
         firmware = re.findall(r"\d{1,2}[.]\d{1,2}[.]\d{1,2}[.]{0,1}\d{0,2}", self.getRawSectionData("Controller(s)"), re.MULTILINE)
         
@@ -91,39 +137,93 @@ class parse_sss():
         else:
             return None
 
+    @memoize
     def getTimezone(self):
-        timezone = re.findall(r"(?:REOPENING PAGE TZ SET: )(.*)",  self.getRawSectionData("Content"), re.MULTILINE)
+        # Only the last time zone set counts, so search backwards
+        content = self.getRawSectionData("Content")
+        start = content.rfind("REOPENING PAGE TZ SET: ")
         
-        if timezone:
-            return timezone[len(timezone) - 1].strip()
+        if start >= 0:
+            start += len("REOPENING PAGE TZ SET: ")
+            end = content.find("\n", start)
+            return content[start:end if end >= 0 else len(content)].strip()
         else:
             return None
 
+    @memoize
+    def getInventory(self):
+        """Return the inventory of pools, virtual disks, physical disks and enclosures"""
+        return Inventory(self)
+    
+    #Sections compared as normalized text by the fingerprint
+    FINGERPRINT_SECTIONS = ["Controller(s)", "Pool(s)", "Virtual Disk(s)"]
+    
+    @memoize
+    def getFingerprint(self):
+        """Hash of the configuration without the naming. Identical subsystems have the same fingerprint.
+        
+           None if a section can't be normalized, such a subsystem is never folded.
+        """
+        names = [self.getSubsystemName()]
+        
+        try:
+            sections = tuple(normalizeSection(self.getRawSectionData(section), names) for section in self.FINGERPRINT_SECTIONS)
+        except ValueError:
+            return None
+        
+        signature = repr((self.getSubsytemModel(), self.getFirmware(), self.getTimezone(), self.getInventory().signature(), sections))
+        
+        if self.getSubsystemName():
+            signature = signature.replace(self.getSubsystemName(), "")
+        
+        return hashlib.sha1(signature.encode()).hexdigest()
+    
+    @memoize
+    def getDiskCount(self):
+        return self.getInventory().disks.total()
+    
+    @memoize
+    def getDiskCapacity(self):
+        """Raw capacity of all physical disks in bytes"""
+        return self.getInventory().disks.capacity()
+    
+    @memoize
+    def getDisksByModel(self):
+        return self.getInventory().disks.byModel()
+    
+    @memoize
     def getDiskSummary(self):
-        pds = re.findall(r"(Found:)( *\d+)( \w+)( +\S+)( +\S+)( +\S+)( \w+)( +\S+)( +\S+)( +\S+)", self.getRawSectionData("Physical Disk(s)"), re.MULTILINE)
-        
-        if pds:    
-            header = """<tr><td>Count</td>
-                            <td>Manufactor</td>
-                            <td>Model</td>
-                            <td>Type</td>
-                            <td>Size</td>
-                            <td>Firmware</td></tr>"""
-            listData = ""           
-            for pdType in pds:   
-                listData = listData + """<tr><td>{}</td>
-                                     <td>{}</td>
-                                     <td>{}</td>
-                                     <td>{}</td>
-                                     <td>{}</td>
-                                     <td>{}</td></tr>""".format(pdType[1].strip(), 
-                                                                pdType[2].strip(), 
-                                                                pdType[3].strip(), 
-                                                                pdType[4].strip(),
-                                                                pdType[5].strip() + pdType[6],
-                                                                pdType[8].strip())
-            
-            summary = "<table>" + header + listData + "</table>"
+        pds = self.getInventory().disks.rows()
         
-            return summary
+        if pds:
+            return ReportTable(["Count", "Manufactor", "Model", "Type", "Size", "Firmware"], pds)
+
+class Sections(Mapping):
+    """The sections of a 'show sub sum', sliced from the content on access
+    
+       "Content" is the whole content.
+    """
+    
+    def __init__(self, content, offsets):
+        self.__content = content
+        self.__offsets = offsets
+    
+    def __getitem__(self, header):
+        if header == "Content":
+            return self.__content
         
+        start, end = self.__offsets[header]
+        return self.__content[start:end].rstrip()
+    
+    def __iter__(self):
+        yield from self.__offsets
+        yield "Content"
+    
+    def __len__(self):
+        return len(self.__offsets) + 1
+    
+    def __contains__(self, header):
+        return header == "Content" or header in self.__offsets
+    
+    def getOffsets(self):
+        return self.__offsets
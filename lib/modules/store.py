@@ -0,0 +1,145 @@
+'''
+Created on 18 Oct 2026
+
+@author: mwolf
+
+This module is for storing the content of the files of interest.
+The raw content of all files is appended to one blob, which is kept in
+memory or spooled to disk, and only the offset and size of each file are
+indexed. A file is decoded the first time a getter asks for it.
+
+'''
+
+import shutil
+
+from collections import OrderedDict
+from collections.abc import Mapping
+from tempfile import SpooledTemporaryFile
+
+from modules import tools
+
+class ContentStore(Mapping):
+    """Content of the files of interest per node
+
+       Behaves like a read-only dict of nodes, where each node is a dict of
+       file names and their decoded content.
+    """
+
+    # Index entry
+    OFFSET = 0
+    SIZE = 1
+    ENVELOPE = 2
+
+    def __init__(self, blob = None, index = None):
+        """blob is a file object or the path of a blob file (e.g. in the cache), which is 
+           opened for each read, so no file handle is kept open.
+        """
+        self.__path = blob if isinstance(blob, str) else None
+        self.__blob = None if self.__path else (blob if blob else SpooledTemporaryFile(max_size=tools.SPOOL_THRESHOLD))
+        self.__index = index if index else OrderedDict()
+        self.__decoded = {}
+
+    def __getitem__(self, host):
+        return NodeContent(self, host)
+
+    def __contains__(self, host):
+        return host in self.__index
+
+    def __iter__(self):
+        return iter(self.__index)
+
+    def __len__(self):
+        return len(self.__index)
+
+    def addHost(self, host):
+        if host not in self.__index:
+            self.__index[host] = OrderedDict()
+
+    def add(self, host, foi, fileobj, envelope = False):
+        """Appends the raw content of a file to the blob
+
+           envelope marks the captured output of a command, where only STDOUT is used.
+        """
+        self.addHost(host)
+
+        self.__blob.seek(0, 2)
+        offset = self.__blob.tell()
+
+        if isinstance(fileobj, bytes):
+            self.__blob.write(fileobj)
+        else:
+            shutil.copyfileobj(fileobj, self.__blob)
+
+        self.__index[host][foi] = [offset, self.__blob.tell() - offset, envelope]
+        self.__decoded.pop((host, foi), None)
+
+    def files(self, host):
+        return self.__index[host]
+
+    def read(self, host, foi):
+        """Returns the raw content of a file"""
+        entry = self.__index[host][foi]
+
+        if self.__path:
+            with open(self.__path, "rb") as blob:
+                blob.seek(entry[self.OFFSET])
+                return blob.read(entry[self.SIZE])
+
+        self.__blob.seek(entry[self.OFFSET])
+        return self.__blob.read(entry[self.SIZE])
+
+    def decode(self, host, foi):
+        """Decodes a file on the first access and keeps the result"""
+        if (host, foi) not in self.__decoded:
+            if self.__index[host][foi][self.ENVELOPE]:
+                content = tools.Envelope(self.read(host, foi)).getContent()
+            else:
+                content = self.read(host, foi).decode("utf-8", "replace")
+
+            self.__decoded[(host, foi)] = content.strip()
+
+        return self.__decoded[(host, foi)]
+
+    def getIndex(self):
+        return self.__index
+
+    def getBlob(self):
+        """The blob of a scanned store, to write it to the cache"""
+        self.__blob.seek(0)
+        return self.__blob
+
+    def close(self):
+        """Closes the blob. Decoded files stay available."""
+        if self.__blob:
+            self.__blob.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+class NodeContent(Mapping):
+    """The files of interest of one node"""
+
+    def __init__(self, store, host):
+        self.__store = store
+        self.__host = host
+        self.__files = store.files(host)
+
+    def __getitem__(self, foi):
+        if foi not in self.__files:
+            raise KeyError(foi)
+
+        return self.__store.decode(self.__host, foi)
+
+    def __contains__(self, foi):
+        """Checks the index only, the file isn't decoded"""
+        return foi in self.__files
+
+    def __iter__(self):
+        return iter(self.__files)
+
+    def __len__(self):
+        return len(self.__files)
@@ -6,8 +6,193 @@ Created on 24 Feb 2019
 
 from __future__ import division
 
+import io
+import os
+import mmap
+import html
+import shutil
+import functools
+
+from tempfile import NamedTemporaryFile
+
 int2byte = (lambda x: bytes((x,)))
 
+def memoize(method):
+    """Caches the result of a method per object and arguments on the first call"""
+    @functools.wraps(method)
+    def cached(self, *args):
+        results = self.__dict__.setdefault("_memoized", {})
+        key = (method.__name__,) + args
+        
+        if key not in results:
+            results[key] = method(self, *args)
+        
+        return results[key]
+    
+    return cached
+
+#Files up to this size are spooled in memory, larger ones to a temp file
+SPOOL_THRESHOLD = 64 * 1024 * 1024
+
+def spool(fileobj, threshold = None):
+    """Copies a file object once to seekable storage
+    
+       Returns
+       -------
+       bytes 
+            the content, if it fits into the threshold
+       str 
+            the path of the temp file, if it doesn't
+    """
+    if threshold is None:
+        threshold = SPOOL_THRESHOLD
+    
+    data = fileobj.read(threshold + 1)
+    
+    if len(data) <= threshold:
+        return data
+    
+    with NamedTemporaryFile(prefix="docscaler_", delete=False) as f:
+        f.write(data)
+        shutil.copyfileobj(fileobj, f)
+    
+    return f.name
+
+class mappedFile(mmap.mmap):
+    """Read-only memory map that can be used as a file object for tarfile and the decompressors"""
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def writable(self):
+        return False
+
+class openSpool():
+    """Opens spooled data with random access. A temp file is mapped into memory 
+       and removed when closed.
+    """
+    def __init__(self, spooled):
+        self.__path = None
+        
+        if isinstance(spooled, bytes):
+            self.__file = io.BytesIO(spooled)
+        else:
+            self.__path = spooled
+            with open(spooled, "rb") as f:
+                self.__file = mappedFile(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def __enter__(self):
+        return self.__file
+    
+    def __exit__(self, *args):
+        self.__file.close()
+        
+        if self.__path:
+            os.unlink(self.__path)
+
+class Envelope():
+    """Captured output of a command as written by esctl and gsctl
+    
+       The header with the exit metadata is followed by "STDOUT:" and "STDERR:". 
+       The markers are searched on the raw bytes and a stream is only decoded 
+       when it is asked for.
+    """
+    STDOUT = b"STDOUT:"
+    STDERR = b"STDERR:"
+    
+    def __init__(self, data):
+        self.__data = memoryview(data)
+        self.__stdout = None
+        self.__stderr = None
+        
+        start = data.find(self.STDOUT)
+        
+        if start != -1:
+            header = start
+            start = start + len(self.STDOUT)
+            
+            if data[start:start + 1] == b"\n":
+                start = start + 1
+            
+            stop = data.find(self.STDERR, start)
+            
+            if stop == -1:
+                self.__stdout = (start, len(data))
+            else:
+                self.__stdout = (start, stop)
+                self.__stderr = (stop + len(self.STDERR), len(data))
+            
+            self.__header = (0, header)
+        else:
+            self.__header = (0, 0)
+    
+    def isEnvelope(self):
+        return self.__stdout is not None
+    
+    def __decode(self, part):
+        if part is None:
+            return None
+        
+        return str(self.__data[part[0]:part[1]], "utf-8", "replace")
+    
+    def getStdout(self):
+        return self.__decode(self.__stdout)
+    
+    def getStderr(self):
+        return self.__decode(self.__stderr)
+    
+    def getMeta(self):
+        """The exit metadata of the header as dict, e.g. the command and its return code"""
+        meta = {}
+        
+        for line in self.__decode(self.__header).splitlines():
+            key, sep, value = line.partition(":")
+            
+            if sep and key.strip():
+                meta[key.strip()] = value.strip()
+        
+        return meta
+    
+    def getContent(self):
+        """STDOUT of the command or the whole content if it isn't an envelope"""
+        if self.isEnvelope():
+            return self.getStdout()
+        
+        return self.__decode((0, len(self.__data)))
+
+class ReportTable():
+    """Header and rows of a table in the report
+    
+       str() gives the HTML table. Templates write it with template.tables.reportTable(),
+       so the TemplateParser builds the reportlab Table from the rows directly.
+    """
+    
+    def __init__(self, header, rows = None):
+        self.header = [str(h) for h in header]
+        self.rows = []
+        
+        for row in rows or []:
+            self.append(row)
+    
+    def append(self, row):
+        self.rows.append([str(value) for value in row])
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    def data(self):
+        """The header and the rows as list of lists"""
+        return [self.header] + self.rows
+    
+    def toHTML(self):
+        return "<table>{}</table>".format("".join("<tr>{}</tr>".format("".join("<td>{}</td>".format(html.escape(value)) for value in row))
+                                                  for row in self.data()))
+    
+    def __str__(self):
+        return self.toHTML()
+
 def istext(filename):
     try:
         with open(filename, "r") as f:
@@ -143,7 +143,11 @@ class TemplateParser():
         self.doc = doc
         self.configData = configData
         
-    def parse(self, html, story):
+    def parse(self, html, story, tables = None):
+        """Adds the flowables of the rendered template to the story
+        
+           tables is the TableRegistry the template was rendered with.
+        """
         self.story = story
         soup = BeautifulSoup(html, 'html.parser')
         
@@ -260,31 +264,48 @@ class TemplateParser():
                         self.story.append(t)
                 else:  
                     #ANY OTHER TABLE
-                    t = Table(tableData)
-                    for each in range(len(tableData)):
-                        if each % 2 == 0:
-                            bg_color = ParagraphStyles.ddnGrey
-                            fg_color = white
-                        else:
-                            bg_color = white
-                            fg_color = black
-    
-                        t.setStyle(TableStyle([('BACKGROUND', (0, each), (-1, each), bg_color),
-                                               ('TEXTCOLOR', (0, each), (-1, each), fg_color)
-                                               ]))
-                    
-                    t.setStyle(TableStyle([('ALIGN',(0,0),(-1,-1),'LEFT'),
-                                           ('VALIGN',(0,0),(-1,-1),'TOP'),
-                                           ('GRID', (0,0), (-1,-1), 0.25, black),
-                                           ('BOX', (0,0), (-1,-1), 0.25, black),
-                                           ('BACKGROUND',(0,0),(-1,0), ParagraphStyles.ddnRed),
-                                           ('TEXTCOLOR',(0,0),(-1,0),white),
-                                           ('FONT', (0,0), (-1,-1), 'Lato', 9, 11)
-                                           ]))
-                    
-                    self.story.append(t)
+                    self.story.append(self.table(tableData))
+            
+            #Table of a getter, no need to parse the rows from HTML
+            if tag.name == "reporttable" and tables is not None:
+                table = tables.resolve(tag["ref"])
+                
+                if table is not None:
+                    self.story.append(self.table(table.data()))
+        
+        # Tables written somewhere else than a reporttable tag aren't needed anymore
+        if tables is not None:
+            tables.clear()
                     
         self.story.append(PageBreak())    
+    
+    def table(self, tableData):
+        """The default table with a red header and alternating row colors"""
+        t = Table(tableData)
+        style = []
+        
+        for each in range(len(tableData)):
+            if each % 2 == 0:
+                bg_color = ParagraphStyles.ddnGrey
+                fg_color = white
+            else:
+                bg_color = white
+                fg_color = black
+
+            style += [('BACKGROUND', (0, each), (-1, each), bg_color),
+                      ('TEXTCOLOR', (0, each), (-1, each), fg_color)]
+        
+        style += [('ALIGN',(0,0),(-1,-1),'LEFT'),
+                  ('VALIGN',(0,0),(-1,-1),'TOP'),
+                  ('GRID', (0,0), (-1,-1), 0.25, black),
+                  ('BOX', (0,0), (-1,-1), 0.25, black),
+                  ('BACKGROUND',(0,0),(-1,0), ParagraphStyles.ddnRed),
+                  ('TEXTCOLOR',(0,0),(-1,0),white),
+                  ('FONT', (0,0), (-1,-1), 'Lato', 9, 11)]
+        
+        t.setStyle(TableStyle(style))
+        
+        return t
             
 class DDNDocTemplate(BaseDocTemplate):
     
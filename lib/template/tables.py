@@ -0,0 +1,70 @@
+'''
+Created on 18 Oct 2026
+
+@author: mwolf
+
+This module is for passing the ReportTables of the getters from the
+templates to the TemplateParser without building and parsing HTML.
+While a template is rendered, its document's TableRegistry is active and
+reportTable() keeps the table in it and writes a <reporttable ref="N"/>
+tag. The TemplateParser resolves the tag with the same registry.
+
+'''
+
+import itertools
+
+from contextvars import ContextVar
+
+_active = ContextVar("tables", default=None)
+
+class TableRegistry():
+    """The tables of one document
+    
+       Usage
+       -----
+       with tables:
+           html = mod.get(config)
+       templateParser.parse(html, story, tables)
+    """
+    
+    def __init__(self):
+        self.__tables = {}
+        self.__refs = itertools.count(1)
+        self.__tokens = []
+    
+    def add(self, table):
+        ref = str(next(self.__refs))
+        self.__tables[ref] = table
+        
+        return '<reporttable ref="{}"></reporttable>'.format(ref)
+    
+    def resolve(self, ref):
+        """The table written with the ref or None"""
+        return self.__tables.pop(ref, None)
+    
+    def clear(self):
+        self.__tables.clear()
+    
+    def __len__(self):
+        return len(self.__tables)
+    
+    def __enter__(self):
+        self.__tokens.append(_active.set(self))
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        _active.reset(self.__tokens.pop())
+        return False
+
+def reportTable(table):
+    """Writes a ReportTable in a template
+    
+       While a document is rendered, the table is kept in its registry. Otherwise,
+       or if the getter returned no table, the HTML table or nothing is written.
+    """
+    if table is None:
+        return ""
+    
+    registry = _active.get()
+    
+    return registry.add(table) if registry is not None else table.toHTML()
@@ -0,0 +1,13 @@
+'''
+Created on 18 Oct 2026
+
+@author: mwolf
+
+The modules are imported from lib, like docscaler.py does.
+
+'''
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lib"))
@@ -0,0 +1,61 @@
+'''
+Created on 18 Oct 2026
+
+@author: mwolf
+'''
+
+import io
+import json
+import glob
+
+from modules.cache import ArchiveCache
+from modules.store import ContentStore
+
+def test_round_trip(tmp_path):
+    archive = tmp_path / "es_showall.tar.gz"
+    archive.write_bytes(b"archive")
+
+    store = ContentStore()
+    store.add("oss1", "lustre.conf", io.BytesIO(b"options lnet networks=o2ib\n"))
+    store.add("oss1", "rpm_qa.txt", io.BytesIO(b"RC: 0\nSTDOUT:\nlustre-1\n"), envelope=True)
+
+    cache = ArchiveCache(str(tmp_path))
+    cache.put(str(archive), "esctl", store.getIndex(), store.getBlob())
+    store.close()
+
+    index = cache.get(str(archive), "esctl")
+
+    with ContentStore(cache.blob(str(archive), "esctl"), index) as cached:
+        assert "lustre.conf" in cached["oss1"]
+        assert cached["oss1"]["lustre.conf"] == "options lnet networks=o2ib"
+        assert cached["oss1"]["rpm_qa.txt"] == "lustre-1"
+
+def test_changed_archive(tmp_path):
+    archive = tmp_path / "gsctl.tar"
+    archive.write_bytes(b"archive")
+
+    cache = ArchiveCache(str(tmp_path))
+    cache.put(str(archive), "gsctl", {"cluster": 1})
+    assert cache.get(str(archive), "gsctl") == {"cluster": 1}
+
+    archive.write_bytes(b"changed archive")
+    assert cache.get(str(archive), "gsctl") is None
+
+def test_older_format(tmp_path):
+    archive = tmp_path / "gsctl.tar"
+    archive.write_bytes(b"archive")
+
+    cache = ArchiveCache(str(tmp_path))
+    cache.put(str(archive), "gsctl", {"cluster": 1})
+
+    entry = glob.glob(str(tmp_path / ArchiveCache.CACHE_DIR / "*.json"))[0]
+
+    with open(entry) as f:
+        cached = json.load(f)
+
+    del cached["version"]
+
+    with open(entry, "w") as f:
+        json.dump(cached, f)
+
+    assert cache.get(str(archive), "gsctl") is None
@@ -0,0 +1,69 @@
+'''
+Created on 18 Oct 2026
+
+@author: mwolf
+'''
+
+import pytest
+
+pytest.importorskip("ClusterShell")
+pytest.importorskip("jsoncfg")
+
+from modules import exascaler
+
+pytestmark = pytest.mark.skipif(exascaler.tomllib is None, reason="no TOML module")
+
+TOML = '''
+[global]
+fs_list = ["fs0"]
+timezone = "UTC"
+ntp_list = ["10.0.0.1"]
+
+[global.set_param_tunings]
+"osc.*.max_rpcs_in_flight" = "16"
+
+[fs.fs0]
+mds_list = ["es01"]
+oss_list = ["es01"]
+mdt_list = {es01 = ["mdt0"]}
+ost_list = {es01 = ["ost0"]}
+
+[host_defaults]
+nics = ["ib0"]
+
+[hosts.es01.nics.ib0]
+device = "ib0"
+ip = "10.0.0.1"
+netmask = "255.255.0.0"
+bonding_mode = "active-backup"
+slaves = "ib0 ib1"
+
+[hosts.es01.nics.ib0.cfg.ib0]
+MTU = "9000"
+'''
+
+def missing(toml):
+    parser = exascaler.exascaler_toml_parser.__new__(exascaler.exascaler_toml_parser)
+    parser._exaconfig = parser._normalize(exascaler.tomllib.loads(toml))
+    return parser._missingSettings()
+
+def test_complete():
+    assert missing(TOML) == []
+
+def test_missing_global():
+    assert missing(TOML.replace('timezone = "UTC"\n', "")) == ["global.timezone"]
+
+def test_missing_fs():
+    assert missing(TOML.replace('oss_list = ["es01"]\n', "")) == ["fs.fs0.oss_list"]
+
+def test_missing_nic_key():
+    """A missing key is missing, even if None is a valid value"""
+    toml = TOML.replace('bonding_mode = "active-backup"\nslaves = "ib0 ib1"\n', "")
+    assert missing(toml) == ["hosts.es01.nics.ib0.bonding_mode"]
+
+def test_missing_slaves():
+    assert missing(TOML.replace('slaves = "ib0 ib1"\n', "")) == ["hosts.es01.nics.ib0.slaves"]
+
+def test_tuning_not_a_string():
+    toml = TOML.replace('"osc.*.max_rpcs_in_flight" = "16"', '"osc.*.max_rpcs_in_flight" = 16')
+    assert missing(toml) == ["global.set_param_tunings.osc.*.max_rpcs_in_flight"]
@@ -0,0 +1,81 @@
+'''
+Created on 18 Oct 2026
+
+@author: mwolf
+'''
+
+import io
+import gzip
+import random
+import tarfile
+
+import pytest
+
+from modules import gzindex
+
+pytestmark = pytest.mark.skipif(not gzindex.available(), reason="libz can't be loaded")
+
+@pytest.fixture
+def archive(tmp_path):
+    """A .tar.gz with compressible and random members"""
+    path = str(tmp_path / "es_showall.tar.gz")
+    rnd = random.Random(1)
+
+    with tarfile.open(path, "w:gz") as tar:
+        for i in range(30):
+            if i % 3:
+                data = bytes(rnd.getrandbits(8) for _ in range(rnd.randint(0, 100000)))
+            else:
+                data = b"line %d\n" % i * rnd.randint(0, 20000)
+
+            member = tarfile.TarInfo("es_showall/node{}/file{}".format(i % 4, i))
+            member.size = len(data)
+            tar.addfile(member, io.BytesIO(data))
+
+    return path
+
+def buildIndex(path, span):
+    builder = gzindex.GzipIndexBuilder(path, span)
+
+    with tarfile.open(fileobj=builder, mode="r|") as tar:
+        members = list(tar)
+
+    builder.save(members)
+    builder.close()
+
+    return gzindex.GzipIndex.load(path)
+
+def test_random_access(archive):
+    index = buildIndex(archive, 65536)
+    data = gzip.open(archive).read()
+    reader = gzindex.GzipReader(index)
+    rnd = random.Random(2)
+
+    assert len(index.points) > 1
+
+    for _ in range(200):
+        offset = rnd.randrange(len(data))
+        size = rnd.randint(0, min(100000, len(data) - offset))
+        assert reader.read(offset, size) == data[offset:offset + size]
+
+    reader.close()
+
+def test_members(archive):
+    tar = gzindex.IndexedTar(buildIndex(archive, 65536))
+
+    with tarfile.open(archive) as reference:
+        names = [member.name for member in tar]
+        assert names == [member.name for member in reference if member.isfile()]
+
+        for member in tar:
+            assert tar.extractfile(member).read() == reference.extractfile(member.name).read()
+
+    tar.close()
+
+def test_changed_archive(archive):
+    buildIndex(archive, 65536)
+
+    with open(archive, "ab") as f:
+        f.write(b"\0")
+
+    assert gzindex.GzipIndex.load(archive) is None
@@ -0,0 +1,35 @@
+'''
+Created on 18 Oct 2026
+
+@author: mwolf
+'''
+
+import pytest
+
+pytest.importorskip("ClusterShell")
+
+from modules.rpm import RpmInventory, parsePackage
+
+def test_parse_package():
+    assert parsePackage("lustre-2.14.0_ddn1-1.el8.x86_64") == ("lustre", "2.14.0_ddn1", "1.el8", "x86_64")
+    assert parsePackage("gpg-pubkey-8483c65d-5ccc5b19") == ("gpg-pubkey", "8483c65d", "5ccc5b19", "")
+    assert parsePackage("lustre") is None
+
+def test_lustre():
+    inventory = RpmInventory("kernel-4.18.0-305.el8.x86_64\n"
+                             "kmod-lustre-2.14.0_ddn1-1.el8.x86_64\n"
+                             "lustre-2.14.0_ddn1-1.el8.x86_64\n")
+
+    assert inventory.getLustre() == "lustre-2.14.0_ddn1-1.el8"
+
+def test_lustre_without_ddn():
+    assert RpmInventory("lustre-2.14.0-1.el8.x86_64\n").getLustre() is None
+    assert RpmInventory("").getLustre() is None
+
+def test_newest_version():
+    inventory = RpmInventory("kernel-4.18.0-305.el8.x86_64\n"
+                             "kernel-4.18.0-1160.el8.x86_64\n"
+                             "kernel-4.18.0-80.el8.x86_64\n")
+
+    assert inventory.getVersion("kernel") == "4.18.0-1160.el8"
+    assert inventory.getVersion(inventory.getKeyPackage("Kernel")) == "4.18.0-1160.el8"
@@ -0,0 +1,54 @@
+'''
+Created on 18 Oct 2026
+
+@author: mwolf
+
+The sections are compared with the results of the former parser of 'show sub sum'.
+
+'''
+
+from modules.sfa import parse_sss, parseSections
+
+def box(header):
+    return "*" * 60 + "\n* " + header.ljust(56) + " *\n" + "*" * 60 + "\n\n"
+
+def sss(jobs = " none"):
+    return (box("Subsystem Summary") +
+            box("Subsystem") + " Name      UID                 Time\n sfa1      60001ff0S1          2023-01-01\n\n Model: SFA ES400NVX2\n\n" +
+            box("Controller(s)") + " Idx  Name          Firmware\n 0    sfa1_c0       12.4.0\n 1    sfa1_c1       12.4.0\n\n" +
+            box("Enclosure(s)") + " Idx  Type    Serial\n 0    SS9012  ENCS1\n\n" +
+            box("Pool(s)") + " Idx  Name     State    Capacity\n 0    pool_0   NORMAL   100\n\n" +
+            box("Jobs") + jobs + "\n\n" +
+            box("Event Log Information") + " 2023 REOPENING PAGE TZ SET: UTC\n\n" +
+            "*" * 60 + "\n")
+
+def test_sections():
+    sss_data = parse_sss(sss())
+
+    assert list(sss_data.getSections()) == ["Subsystem", "Controller(s)", "Enclosure(s)", "Pool(s)"]
+    assert sss_data.getRawSectionData("Controller(s)") == " Idx  Name          Firmware\n 0    sfa1_c0       12.4.0\n 1    sfa1_c1       12.4.0"
+    assert sss_data.getRawSectionData("Pool(s)") == " Idx  Name     State    Capacity\n 0    pool_0   NORMAL   100"
+
+def test_sections_given():
+    """The offsets parsed in the process pool are used as they are"""
+    content = sss()
+    sss_data = parse_sss(content, parseSections(content))
+
+    assert list(sss_data.getSections()) == ["Subsystem", "Controller(s)", "Enclosure(s)", "Pool(s)"]
+    assert sss_data.getRawSectionData("Enclosure(s)") == " Idx  Type    Serial\n 0    SS9012  ENCS1"
+
+def test_jobs_with_asterisk_without_footer():
+    content = (box("Subsystem") + " Name\n a\n\n" +
+               box("Controller(s)") + " c\n\n" +
+               box("Jobs") + " job * running\n\n" +
+               box("Enclosure(s)") + " e\n\n")
+    sss_data = parse_sss(content)
+
+    assert list(sss_data.getSections()) == ["Subsystem"]
+    assert sss_data.getRawSectionData("Subsystem") == " Name\n a"
+
+def test_jobs_with_asterisk():
+    sss_data = parse_sss(sss(" job * running"))
+
+    assert list(sss_data.getSections()) == ["Subsystem", "Controller(s)", "Enclosure(s)", "Pool(s)"]
+    assert sss_data.getRawSectionData("Jobs") is None
@@ -0,0 +1,30 @@
+'''
+Created on 18 Oct 2026
+
+@author: mwolf
+'''
+
+from modules.tools import Envelope
+
+def test_envelope():
+    envelope = Envelope(b"COMMAND: rpm -qa\nRC: 0\nSTDOUT:\nlustre-1\nSTDERR:\nwarning\n")
+
+    assert envelope.isEnvelope()
+    assert envelope.getMeta() == {"COMMAND": "rpm -qa", "RC": "0"}
+    assert envelope.getStdout() == "lustre-1\n"
+    assert envelope.getStderr() == "\nwarning\n"
+    assert envelope.getContent() == "lustre-1\n"
+
+def test_envelope_without_stderr():
+    envelope = Envelope(b"RC: 0\nSTDOUT:\nlustre-1\n")
+
+    assert envelope.getStdout() == "lustre-1\n"
+    assert envelope.getStderr() is None
+
+def test_plain_file():
+    envelope = Envelope(b"options lnet networks=o2ib\n")
+
+    assert not envelope.isEnvelope()
+    assert envelope.getStdout() is None
+    assert envelope.getMeta() == {}
+    assert envelope.getContent() == "options lnet networks=o2ib\n"